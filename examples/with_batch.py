@@ -0,0 +1,28 @@
+"""
+pip install -U kokoro-onnx soundfile
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+python examples/with_batch.py
+
+Note: batch-capable models (dynamic batch axis that mask padded items) run the whole batch in a single session call,
+other models, like the released ones, fall back to creating the texts one by one.
+"""
+
+import soundfile as sf
+
+from kokoro_onnx import Kokoro
+
+texts = [
+    "Hello. This audio generated by kokoro!",
+    "Please hold, your call is important to us.",
+    "Your balance is twelve dollars.",
+]
+
+kokoro = Kokoro("kokoro-v1.0.onnx", "voices-v1.0.bin")
+results = kokoro.create_batch(
+    texts, voices=["af_sarah", "am_adam", "af_nicole"], speeds=1.0, lang="en-us"
+)
+for i, (samples, sample_rate) in enumerate(results):
+    sf.write(f"audio_{i}.wav", samples, sample_rate)
+    print(f"Created audio_{i}.wav")
@@ -0,0 +1,27 @@
+"""
+pip install -U kokoro-onnx soundfile
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+python examples/with_cache.py
+
+Reuse the audio of chunks created before, in memory and in the audio_cache folder across runs.
+"""
+
+import time
+
+import soundfile as sf
+
+from kokoro_onnx import Kokoro
+from kokoro_onnx.cache import AudioCache
+
+cache = AudioCache(disk_path="audio_cache", disk_dtype="int16")
+kokoro = Kokoro("kokoro-v1.0.onnx", "voices-v1.0.bin", audio_cache=cache)
+for _ in range(2):
+    start_t = time.time()
+    samples, sample_rate = kokoro.create(
+        "Please hold, your call is important to us.", voice="af_sarah"
+    )
+    print(f"Created audio in {time.time() - start_t:.2f}s")
+sf.write("audio.wav", samples, sample_rate)
+print(f"Memory: {cache.memory.stats()}\nDisk: {cache.disk_stats()}")
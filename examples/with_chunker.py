@@ -0,0 +1,31 @@
+"""
+pip install -U kokoro-onnx soundfile
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+python examples/with_chunker.py
+
+Choose how long text is split into model runs.
+Chunker.throughput() (the default) uses the fewest runs with even lengths,
+Chunker.latency() starts with a short chunk so audio is ready sooner.
+"""
+
+import soundfile as sf
+
+from kokoro_onnx import Chunker, Kokoro
+
+text = """
+Kokoro is an open-weight TTS model with 82 million parameters. Despite its lightweight architecture,
+it delivers comparable quality to larger models while being significantly faster and more cost-efficient.
+"""
+
+kokoro = Kokoro(
+    "kokoro-v1.0.onnx",
+    "voices-v1.0.bin",
+    chunker=Chunker.latency(first_chunk_tokens=40),
+)
+phonemes = kokoro.tokenizer.phonemize(text)
+print([len(chunk) for chunk in kokoro.chunker.split(phonemes)])
+samples, sample_rate = kokoro.create(text, voice="af_sarah")
+sf.write("audio.wav", samples, sample_rate)
+print("Created audio.wav")
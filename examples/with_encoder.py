@@ -0,0 +1,42 @@
+"""
+pip install -U kokoro-onnx[opus]
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+python examples/with_encoder.py
+
+Encode audio to bytes ready to send, e.g. over HTTP or to a telephony provider.
+Formats: pcm (16-bit little-endian), wav, mulaw, alaw and opus (Ogg/Opus, needs soundfile).
+"""
+
+import asyncio
+
+from kokoro_onnx import Kokoro
+from kokoro_onnx.encoders import encode_audio, encode_stream, get_encoder
+
+text = """
+We've just been hearing from Matthew Cappucci, a senior meteorologist at the weather app MyRadar, who says Kansas City is seeing its heaviest snow in 32 years - with more than a foot (30 to 40cm) having come down so far.
+"""
+
+
+async def save_stream(stream, encoder, f):
+    # Chunk by chunk, each chunk can be written out as soon as it's encoded
+    async for data in encode_stream(stream, encoder):
+        f.write(data)
+
+
+def main():
+    kokoro = Kokoro("kokoro-v1.0.onnx", "voices-v1.0.bin")
+
+    # Whole audio at once
+    samples, sample_rate = kokoro.create(text, voice="af_sarah", lang="en-us")
+    with open("audio.wav", "wb") as f:
+        f.write(encode_audio(samples, sample_rate, get_encoder("wav")))
+
+    stream = kokoro.create_stream(text, voice="af_sarah", lang="en-us")
+    with open("audio.ogg", "wb") as f:
+        asyncio.run(save_stream(stream, get_encoder("opus"), f))
+    print("Created audio.wav and audio.ogg")
+
+
+main()
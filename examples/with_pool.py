@@ -0,0 +1,37 @@
+"""
+pip install -U kokoro-onnx
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+python examples/with_pool.py
+
+Serve concurrent requests from a pool of sessions, the CPU cores are split between them.
+You can also pass your own sessions with Kokoro.from_session([session1, session2], ...)
+"""
+
+import asyncio
+
+from kokoro_onnx import Kokoro
+
+kokoro = Kokoro("kokoro-v1.0.onnx", "voices-v1.0.bin", pool_size=2)
+
+
+async def request(text: str):
+    async for samples, sample_rate in kokoro.create_stream(text, voice="af_sarah"):
+        print(f"Created chunk of {len(samples) / sample_rate:.2f}s for {text!r}")
+
+
+async def main():
+    await asyncio.gather(
+        request("Hello. This audio generated by kokoro!"),
+        request("Please hold, your call is important to us."),
+        request("Your balance is twelve dollars."),
+        request("Thank you for calling, goodbye."),
+    )
+    stats = kokoro.pool.stats()
+    print(
+        f"Sessions waited on average {stats.avg_wait:.3f}s (max {stats.max_wait:.3f}s)"
+    )
+
+
+asyncio.run(main())
@@ -0,0 +1,41 @@
+"""
+pip install -U kokoro-onnx soundfile
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+python examples/with_sample_rate.py
+
+Create audio at another sample rate than the model's 24 kHz, e.g. 8 kHz for telephony or 48 kHz for WebRTC.
+Streams are resampled chunk by chunk without clicks between chunks.
+"""
+
+import asyncio
+
+import soundfile as sf
+
+from kokoro_onnx import Kokoro
+from kokoro_onnx.encoders import MuLawEncoder, encode_stream
+
+text = "Thank you for calling. Your call is important to us, please stay on the line."
+
+
+async def stream_mulaw(kokoro: Kokoro) -> bytes:
+    # 8 kHz mu-law, the usual format for phone calls
+    stream = kokoro.create_stream(text, voice="af_sarah", sample_rate=8000)
+    return b"".join(
+        [bytes(data) async for data in encode_stream(stream, MuLawEncoder(8000))]
+    )
+
+
+def main():
+    kokoro = Kokoro("kokoro-v1.0.onnx", "voices-v1.0.bin")
+
+    samples, sample_rate = kokoro.create(text, voice="af_sarah", sample_rate=48000)
+    sf.write("audio.wav", samples, sample_rate)
+    print(f"Created audio.wav at {sample_rate} Hz")
+
+    mulaw = asyncio.run(stream_mulaw(kokoro))
+    print(f"Created {len(mulaw)} bytes of 8 kHz mu-law")
+
+
+main()
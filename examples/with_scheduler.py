@@ -0,0 +1,40 @@
+"""
+pip install -U kokoro-onnx
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+python examples/with_scheduler.py
+
+Batch the chunks of concurrent requests into shared session runs.
+Chunks are collected for up to window seconds, batch-capable models (dynamic batch axis)
+run them as one batch, others, like the released models, back to back on one session.
+"""
+
+import asyncio
+
+from kokoro_onnx import BatchScheduler, Kokoro
+
+scheduler = BatchScheduler(window=0.01, max_batch_size=16)
+kokoro = Kokoro("kokoro-v1.0.onnx", "voices-v1.0.bin", scheduler=scheduler)
+
+
+async def request(text: str):
+    async for samples, sample_rate in kokoro.create_stream(text, voice="af_sarah"):
+        print(f"Created chunk of {len(samples) / sample_rate:.2f}s for {text!r}")
+
+
+async def main():
+    await asyncio.gather(
+        request("Hello. This audio generated by kokoro!"),
+        request("Please hold, your call is important to us."),
+        request("Your balance is twelve dollars."),
+        request("Thank you for calling, goodbye."),
+    )
+    stats = scheduler.stats()
+    print(
+        f"{stats.items} chunks in {stats.batches} batches, "
+        f"waited on average {stats.avg_queue_wait * 1000:.1f}ms (max {stats.max_queue_wait * 1000:.1f}ms)"
+    )
+
+
+asyncio.run(main())
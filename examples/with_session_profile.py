@@ -0,0 +1,26 @@
+"""
+pip install -U kokoro-onnx soundfile
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+python examples/with_session_profile.py
+
+Tune ONNX Runtime threads and spinning, and cache the optimized graph on disk.
+The first run saves the optimized model to optimized_model_dir, later runs load it and skip graph optimization.
+"""
+
+import soundfile as sf
+
+from kokoro_onnx import Kokoro, SessionProfile
+
+profile = SessionProfile(
+    intra_op_num_threads=4,
+    allow_spinning=False,
+    optimized_model_dir=".kokoro-cache",
+)
+kokoro = Kokoro("kokoro-v1.0.onnx", "voices-v1.0.bin", session_profile=profile)
+samples, sample_rate = kokoro.create(
+    "Hello. This audio generated by kokoro!", voice="af_sarah", speed=1.0, lang="en-us"
+)
+sf.write("audio.wav", samples, sample_rate)
+print("Created audio.wav")
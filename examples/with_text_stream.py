@@ -0,0 +1,41 @@
+"""
+Note: on Linux you need to run this as well: apt-get install portaudio19-dev
+
+pip install -U kokoro-onnx sounddevice
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+python examples/with_text_stream.py
+
+Speak text while it's still being generated, for example token by token from an LLM.
+"""
+
+import asyncio
+
+import sounddevice as sd
+
+from kokoro_onnx import Kokoro
+
+text = """
+Sure! Kansas City is seeing its heaviest snow in 32 years, with more than a foot having come down so far.
+Temperatures are set to drop in the next several days, so it's best to stay home if you can.
+"""
+
+
+async def llm_tokens():
+    # Simulate an LLM producing a word every 50ms
+    for word in text.split(" "):
+        await asyncio.sleep(0.05)
+        yield word + " "
+
+
+async def main():
+    kokoro = Kokoro("kokoro-v1.0.onnx", "voices-v1.0.bin")
+    stream = kokoro.create_stream(llm_tokens(), voice="af_nicole", lang="en-us")
+    async for samples, sample_rate in stream:
+        print("Playing audio stream...")
+        sd.play(samples, sample_rate)
+        sd.wait()
+
+
+asyncio.run(main())
@@ -0,0 +1,19 @@
+"""
+pip install -U kokoro-onnx
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+python examples/with_warmup.py
+
+Warm up the model before serving, so the first requests run at steady state latency.
+"""
+
+from kokoro_onnx import Kokoro
+
+kokoro = Kokoro("kokoro-v1.0.onnx", "voices-v1.0.bin")
+timings = kokoro.warmup(lengths=[32, 128, 510], voices=["af_sarah"], langs=["en-us"])
+for length, seconds in timings.items():
+    print(f"{length} tokens: first run {seconds[0]:.3f}s, last run {seconds[-1]:.3f}s")
+
+samples, sample_rate = kokoro.create("Ready to serve.", voice="af_sarah")
+print(f"Created {len(samples) / sample_rate:.2f}s of audio")
@@ -0,0 +1,139 @@
+"""
+Compare latency and memory with and without shape bucketing on a synthetic mixed-length workload.
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+uv run scripts/benchmark_buckets.py
+uv run scripts/benchmark_buckets.py --requests 500 --model kokoro-v1.0.int8.onnx
+
+Each mode runs in its own process so peak RSS is measured independently.
+Afterwards the first --compare requests are created with and without bucketing and the outputs compared,
+padding changes what the model sees, so the audio is close but not always bit identical.
+"""
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from kokoro_onnx import Kokoro
+from kokoro_onnx.config import BUCKET_LENGTHS
+
+# Phonemes without punctuation, so each request is a single chunk of the chosen length
+PHONEMES = "abdefhijklmnoprstuvwzæðŋɑɔəɛɜɪʃʊʌʒθ ˈˌː"
+
+
+def workload(requests: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(PHONEMES) for _ in range(rng.randint(8, 500))).strip()
+        for _ in range(requests)
+    ]
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as fp:
+            pages = int(fp.read().split()[1])
+        return pages * resource.getpagesize() / 1024 / 1024
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def worker(args, bucketing: bool):
+    kokoro = Kokoro(
+        args.model,
+        args.voices,
+        bucket_lengths=BUCKET_LENGTHS if bucketing else None,
+    )
+    voice = kokoro.get_voice_style(args.voice)
+    latencies = []
+    for phonemes in workload(args.requests, args.seed):
+        start_t = time.perf_counter()
+        kokoro.create(phonemes, voice, is_phonemes=True, trim=False)
+        latencies.append(time.perf_counter() - start_t)
+    latencies = np.array(latencies) * 1000
+    print(
+        json.dumps(
+            {
+                "p50": float(np.percentile(latencies, 50)),
+                "p99": float(np.percentile(latencies, 99)),
+                "std": float(latencies.std()),
+                "rss": current_rss_mb(),
+                "peak_rss": peak_rss_mb(),
+            }
+        )
+    )
+
+
+def compare(args):
+    plain = Kokoro(args.model, args.voices)
+    bucketed = Kokoro(args.model, args.voices, bucket_lengths=BUCKET_LENGTHS)
+    voice = plain.get_voice_style(args.voice)
+    worst_snr = np.inf
+    worst_length = 0
+    max_diff = 0.0
+    for phonemes in workload(args.requests, args.seed)[: args.compare]:
+        expected, _ = plain.create(phonemes, voice, is_phonemes=True, trim=False)
+        actual, _ = bucketed.create(phonemes, voice, is_phonemes=True, trim=False)
+        worst_length = max(worst_length, abs(len(expected) - len(actual)))
+        n = min(len(expected), len(actual))
+        noise = np.sum((expected[:n] - actual[:n]) ** 2)
+        if noise > 0:
+            snr = 10 * np.log10(np.sum(expected[:n] ** 2) / noise)
+            worst_snr = min(worst_snr, snr)
+            max_diff = max(max_diff, float(np.abs(expected[:n] - actual[:n]).max()))
+    print(
+        f"Bucketed vs plain output over {args.compare} requests: "
+        f"length differs by up to {worst_length} samples, "
+        f"max abs diff {max_diff:.5f}, worst SNR {worst_snr:.1f}dB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser("Benchmark shape bucketing")
+    parser.add_argument("--model", default="kokoro-v1.0.onnx")
+    parser.add_argument("--voices", default="voices-v1.0.bin")
+    parser.add_argument("--voice", default="af_sarah")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--compare",
+        type=int,
+        default=20,
+        help="requests to compare bucketed and plain output on",
+    )
+    parser.add_argument("--worker", choices=["plain", "bucketed"])
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args, args.worker == "bucketed")
+        return
+
+    print(
+        f"{'mode':<10} {'p50 ms':>10} {'p99 ms':>10} {'std ms':>10} {'RSS MB':>10} {'peak MB':>10}"
+    )
+    for mode in ["plain", "bucketed"]:
+        cmd = [sys.executable, __file__, *sys.argv[1:], "--worker", mode]
+        result = json.loads(subprocess.check_output(cmd).splitlines()[-1])
+        print(
+            f"{mode:<10} {result['p50']:>10.1f} {result['p99']:>10.1f} {result['std']:>10.1f} "
+            f"{result['rss']:>10.1f} {result['peak_rss']:>10.1f}"
+        )
+    if args.compare:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
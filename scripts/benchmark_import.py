@@ -0,0 +1,81 @@
+"""
+Measure import time of kokoro_onnx with python -X importtime and guard against regressions.
+
+uv run scripts/benchmark_import.py
+uv run scripts/benchmark_import.py --max-ms 150 --top 15
+
+Exits with status 1 if `import kokoro_onnx` takes longer than --max-ms (best of --runs)
+or imports one of the heavy dependencies that should only be loaded on first use.
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Loaded on first use of Kokoro or Tokenizer, never by `import kokoro_onnx` alone
+HEAVY_MODULES = ["onnxruntime", "numpy", "phonemizer", "espeakng_loader"]
+
+
+def importtime(statement: str) -> tuple[float, dict[str, int]]:
+    """
+    Run statement in a fresh interpreter.
+    Returns total import time in ms of the top level imports, and cumulative microseconds per module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    modules = {}
+    # Lines look like: import time:   self [us] | cumulative | imported package
+    # nested imports are indented by two spaces per level
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+        modules[name.strip()] = int(cumulative)
+    return total / 1000, modules
+
+
+def report(statement: str, runs: int, top: int) -> tuple[float, dict[str, int]]:
+    # Imports done by the interpreter itself at startup (site, encodings)
+    baseline = min(importtime("pass")[0] for _ in range(runs))
+    total, modules = min(
+        (importtime(statement) for _ in range(runs)), key=lambda sample: sample[0]
+    )
+    total -= baseline
+    print(f"{statement}: {total:.1f}ms")
+    for name, cumulative in sorted(modules.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {cumulative / 1000:>8.1f}ms  {name}")
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser("Benchmark import time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    import_ms, modules = report("import kokoro_onnx", args.runs, args.top)
+    report("from kokoro_onnx import Kokoro", args.runs, args.top)
+
+    failed = False
+    if import_ms > args.max_ms:
+        print(f"FAIL: import kokoro_onnx took {import_ms:.1f}ms > {args.max_ms}ms")
+        failed = True
+    eager = [name for name in HEAVY_MODULES if name in modules]
+    if eager:
+        print(f"FAIL: import kokoro_onnx eagerly imports {', '.join(eager)}")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Measure per call phonemization latency of short prompts with a fresh espeak backend per call
+(what phonemizer.phonemize() does without its cache) versus the Tokenizer's persistent backends,
+and bulk phonemization of many texts one by one versus with phonemize_batch.
+
+uv run scripts/benchmark_phonemize.py
+uv run scripts/benchmark_phonemize.py --texts 50000 --njobs 4
+"""
+
+import argparse
+import time
+
+from phonemizer.backend import EspeakBackend
+from phonemizer.separator import default_separator
+
+from kokoro_onnx.tokenizer import Tokenizer
+
+PROMPTS = [
+    "Please hold.",
+    "Your balance is twelve dollars.",
+    "Thank you for calling.",
+    "Press one for sales.",
+]
+
+
+def fresh_backend(prompt: str, lang: str) -> str:
+    backend = EspeakBackend(lang, preserve_punctuation=True, with_stress=True)
+    return "".join(
+        backend.phonemize([prompt], separator=default_separator, strip=False)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser("Benchmark espeak backend reuse")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--lang", default="en-us")
+    parser.add_argument("--texts", type=int, default=5000)
+    parser.add_argument("--njobs", type=int, default=2)
+    args = parser.parse_args()
+
+    tokenizer = Tokenizer()
+    # Sets up the espeak library, which the tokenizer does on first use
+    tokenizer.get_backend(args.lang)
+
+    benchmarks = {
+        "fresh backend": lambda prompt: fresh_backend(prompt, args.lang),
+        "persistent backend": lambda prompt: tokenizer.phonemize(prompt, args.lang),
+    }
+    for name, phonemize in benchmarks.items():
+        start_t = time.perf_counter()
+        for i in range(args.calls):
+            phonemize(PROMPTS[i % len(PROMPTS)])
+        per_call = (time.perf_counter() - start_t) / args.calls * 1000
+        print(f"{name:<20} {per_call:.3f}ms per call")
+    print(f"Backend cache: {tokenizer.backends.stats()}")
+
+    texts = [f"Item {i}: {PROMPTS[i % len(PROMPTS)]}" for i in range(args.texts)]
+    bulk = {
+        "one by one": lambda t: [t.phonemize(text, args.lang) for text in texts],
+        "batch": lambda t: t.phonemize_batch(texts, args.lang),
+        f"batch njobs={args.njobs}": lambda t: t.phonemize_batch(
+            texts, args.lang, njobs=args.njobs
+        ),
+    }
+    for name, phonemize in bulk.items():
+        # Without the phoneme cache, so every text is phonemized
+        bulk_tokenizer = Tokenizer(phoneme_cache_size=0)
+        bulk_tokenizer.get_backend(args.lang)
+        start_t = time.perf_counter()
+        phonemize(bulk_tokenizer)
+        print(f"{name:<20} {time.perf_counter() - start_t:.2f}s for {len(texts)} texts")
+
+
+if __name__ == "__main__":
+    main()
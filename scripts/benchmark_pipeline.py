@@ -0,0 +1,47 @@
+"""
+Compare wall time of Kokoro.create with and without pipelining on a long document.
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+uv run scripts/benchmark_pipeline.py
+"""
+
+import argparse
+import time
+
+from kokoro_onnx import Kokoro
+
+PARAGRAPH = (
+    "The sky above the port was the color of television, tuned to a dead channel. "
+    "It's not like I'm using, Case heard someone say, as he shouldered his way through the crowd. "
+    "It's like my body's developed this massive drug deficiency. "
+)
+
+
+def main():
+    parser = argparse.ArgumentParser("Benchmark pipelined create")
+    parser.add_argument("--model", default="kokoro-v1.0.onnx")
+    parser.add_argument("--voices", default="voices-v1.0.bin")
+    parser.add_argument("--voice", default="af_sarah")
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    kokoro = Kokoro(args.model, args.voices)
+    text = PARAGRAPH * args.paragraphs
+    # Warm up the session and espeak before timing
+    kokoro.create(PARAGRAPH, args.voice)
+
+    for pipeline in [False, True]:
+        timings = []
+        for _ in range(args.repeat):
+            start_t = time.perf_counter()
+            samples, sample_rate = kokoro.create(text, args.voice, pipeline=pipeline)
+            timings.append(time.perf_counter() - start_t)
+        print(
+            f"pipeline={pipeline!s:<5} best {min(timings):.2f}s for {len(samples) / sample_rate:.1f}s of audio"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare the streaming Resampler with resampling each chunk on its own downstream (scipy resample_poly),
+for speed and for the error at chunk boundaries, against resampling the whole audio at once.
+
+uv pip install scipy
+uv run scripts/benchmark_resample.py
+uv run scripts/benchmark_resample.py --rates 8000 16000 48000 --chunks 200
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from kokoro_onnx.config import SAMPLE_RATE
+from kokoro_onnx.resampler import Resampler, resample
+
+
+def workload(chunks: int, seconds: float, seed: int) -> list[np.ndarray]:
+    """
+    Chunks of one continuous signal, a few drifting tones with some noise, cut at random lengths
+    """
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(SAMPLE_RATE // 2, int(seconds * SAMPLE_RATE), chunks)
+    t = np.arange(lengths.sum()) / SAMPLE_RATE
+    signal = sum(
+        0.2 * np.sin(2 * np.pi * f * t * (1 + 0.01 * np.sin(t)))
+        for f in (180, 440, 2500, 7000)
+    )
+    signal += rng.standard_normal(len(t)) * 0.01
+    return np.split(signal.astype(np.float32), np.cumsum(lengths)[:-1])
+
+
+def streamed(chunks: list[np.ndarray], rate: int) -> np.ndarray:
+    resampler = Resampler(rate)
+    return np.concatenate([resampler.process(c) for c in chunks] + [resampler.flush()])
+
+
+def per_chunk(chunks: list[np.ndarray], rate: int) -> np.ndarray:
+    from scipy.signal import resample_poly
+
+    divisor = math.gcd(rate, SAMPLE_RATE)
+    up, down = rate // divisor, SAMPLE_RATE // divisor
+    return np.concatenate([resample_poly(c, up, down) for c in chunks])
+
+
+def timed(name: str, fn, chunks: list[np.ndarray], rate: int, reference: np.ndarray):
+    # Warm up imports and cached filters
+    fn(chunks[:1], rate)
+    start_t = time.perf_counter()
+    output = fn(chunks, rate)
+    elapsed = time.perf_counter() - start_t
+    seconds = sum(map(len, chunks)) / SAMPLE_RATE
+    size = min(len(output), len(reference))
+    error = np.abs(output[:size] - reference[:size]).max()
+    print(
+        f"{rate:>6} {name:<22} {elapsed / seconds * 1000:>7.3f}ms per second of audio, "
+        f"max error vs whole audio {error:.2e}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser("Benchmark streaming resampling")
+    parser.add_argument(
+        "--rates", type=int, nargs="+", default=[8000, 16000, 22050, 44100, 48000]
+    )
+    parser.add_argument("--chunks", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=4.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    chunks = workload(args.chunks, args.seconds, args.seed)
+    try:
+        import scipy  # noqa: F401
+
+        has_scipy = True
+    except ImportError:
+        has_scipy = False
+        print("scipy is not installed, only the Resampler runs")
+
+    for rate in args.rates:
+        reference = resample(np.concatenate(chunks), rate)
+        timed("Resampler (streamed)", streamed, chunks, rate, reference)
+        if has_scipy:
+            timed("resample_poly per chunk", per_chunk, chunks, rate, reference)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Measure the per call overhead of running short utterances through the session:
+inputs rebuilt as nested lists on every call (how older versions did it), precomputed numpy inputs, and IOBinding.
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+uv run scripts/benchmark_run_overhead.py
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from kokoro_onnx import Kokoro
+
+
+def nested_list_run(kokoro: Kokoro, phonemes: str, voice, speed: float):
+    # The token list the session was fed before inputs were built as arrays
+    tokens = kokoro.tokenizer.tokenize(phonemes).tolist()
+    names = [i.name for i in kokoro.sess.get_inputs()]
+    inputs = {
+        "input_ids" if "input_ids" in names else "tokens": [[0, *tokens, 0]],
+        "style": np.array(voice[len(tokens)], dtype=np.float32),
+        "speed": np.array([speed], dtype=kokoro._speed_dtype),
+    }
+    return kokoro.sess.run(None, inputs)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser("Benchmark per call overhead")
+    parser.add_argument("--model", default="kokoro-v1.0.onnx")
+    parser.add_argument("--voices", default="voices-v1.0.bin")
+    parser.add_argument("--voice", default="af_sarah")
+    parser.add_argument("--text", default="Please hold.")
+    parser.add_argument("--calls", type=int, default=100)
+    args = parser.parse_args()
+
+    kokoro = Kokoro(args.model, args.voices)
+    kokoro_binding = Kokoro.from_session(kokoro.sess, args.voices, io_binding=True)
+    voice = kokoro.get_voice_style(args.voice)
+    phonemes = kokoro.tokenizer.phonemize(args.text)
+
+    benchmarks = {
+        "nested list inputs": lambda: nested_list_run(kokoro, phonemes, voice, 1.0),
+        "numpy inputs": lambda: kokoro._create_audio(phonemes, voice, 1.0),
+        "io binding": lambda: kokoro_binding._create_audio(phonemes, voice, 1.0),
+    }
+    for name, run in benchmarks.items():
+        # Warm up
+        run()
+        start_t = time.perf_counter()
+        for _ in range(args.calls):
+            run()
+        per_call = (time.perf_counter() - start_t) / args.calls * 1000
+        print(f"{name:<20} {per_call:.3f}ms per call")
+
+
+if __name__ == "__main__":
+    main()
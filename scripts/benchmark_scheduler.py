@@ -0,0 +1,73 @@
+"""
+Compare throughput of concurrent Kokoro.create calls with and without the micro-batching scheduler.
+Batching pays off with a batch-capable model (dynamic batch axis, per item padding masks).
+scripts/export.py exports batch size 1, those models run a group back to back on one session.
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+uv run scripts/benchmark_scheduler.py
+uv run scripts/benchmark_scheduler.py --clients 16 --window 0.02 --pool_size 2
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from kokoro_onnx import Kokoro
+from kokoro_onnx.scheduler import BatchScheduler
+
+SENTENCES = [
+    "The sky above the port was the color of television, tuned to a dead channel.",
+    "It's not like I'm using, Case heard someone say.",
+    "It's like my body's developed this massive drug deficiency.",
+    "He shouldered his way through the crowd.",
+]
+
+
+def run(kokoro: Kokoro, voice: str, clients: int, requests: int) -> float:
+    texts = [SENTENCES[i % len(SENTENCES)] for i in range(requests)]
+    # Same texts first, so phonemes come from the cache in the timed run
+    for text in SENTENCES:
+        kokoro.create(text, voice)
+    start_t = time.perf_counter()
+    with ThreadPoolExecutor(clients) as executor:
+        list(executor.map(lambda text: kokoro.create(text, voice), texts))
+    return time.perf_counter() - start_t
+
+
+def main():
+    parser = argparse.ArgumentParser("Benchmark micro-batching of concurrent calls")
+    parser.add_argument("--model", default="kokoro-v1.0.onnx")
+    parser.add_argument("--voices", default="voices-v1.0.bin")
+    parser.add_argument("--voice", default="af_sarah")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--pool_size", type=int, default=1)
+    parser.add_argument("--window", type=float, default=0.01)
+    parser.add_argument("--max_batch_size", type=int, default=16)
+    args = parser.parse_args()
+
+    kokoro = Kokoro(args.model, args.voices, pool_size=args.pool_size)
+    elapsed = run(kokoro, args.voice, args.clients, args.requests)
+    print(
+        f"Without scheduler: {elapsed:.2f}s, {args.requests / elapsed:.2f} requests/s"
+    )
+
+    scheduler = BatchScheduler(args.window, args.max_batch_size)
+    kokoro = Kokoro(
+        args.model, args.voices, pool_size=args.pool_size, scheduler=scheduler
+    )
+    elapsed = run(kokoro, args.voice, args.clients, args.requests)
+    stats = scheduler.stats()
+    scheduler.close()
+    print(
+        f"With scheduler:    {elapsed:.2f}s, {args.requests / elapsed:.2f} requests/s"
+    )
+    print(
+        f"Batch model: {kokoro._supports_batch()}, average batch {stats.avg_batch_size:.2f} chunks, "
+        f"queue wait avg {stats.avg_queue_wait * 1000:.1f}ms max {stats.max_queue_wait * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Measure cold start time of Kokoro with and without the optimized model cache.
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+uv run scripts/benchmark_startup.py
+uv run scripts/benchmark_startup.py --runs 5 --model kokoro-v1.0.int8.onnx
+
+Each start runs in its own process, the first cached start populates the cache.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def worker(args, cache_dir: str | None):
+    start_t = time.perf_counter()
+    from kokoro_onnx import Kokoro, SessionProfile
+
+    kokoro = Kokoro(
+        args.model,
+        args.voices,
+        session_profile=SessionProfile(optimized_model_dir=cache_dir),
+    )
+    kokoro.create("Hello", args.voice)
+    print(json.dumps({"startup": time.perf_counter() - start_t}))
+
+
+def run(args, cache_dir: str | None) -> float:
+    cmd = [sys.executable, __file__, *sys.argv[1:], "--worker"]
+    if cache_dir:
+        cmd += ["--cache-dir", cache_dir]
+    result = json.loads(subprocess.check_output(cmd).splitlines()[-1])
+    return result["startup"]
+
+
+def main():
+    parser = argparse.ArgumentParser("Benchmark startup time")
+    parser.add_argument("--model", default="kokoro-v1.0.onnx")
+    parser.add_argument("--voices", default="voices-v1.0.bin")
+    parser.add_argument("--voice", default="af_sarah")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--cache-dir")
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args, args.cache_dir)
+        return
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        first = run(args, cache_dir)
+        plain = [run(args, None) for _ in range(args.runs)]
+        cached = [run(args, cache_dir) for _ in range(args.runs)]
+    print(f"First start (populates cache): {first:.2f}s")
+    print(f"Without cache: {min(plain):.2f}s (best of {args.runs})")
+    print(f"With cache:    {min(cached):.2f}s (best of {args.runs})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare the per character tokenizer and phoneme filter with the vectorized vocab lookup,
+on a large document and on a bulk workload of many short strings.
+
+uv run scripts/benchmark_tokenizer.py
+uv run scripts/benchmark_tokenizer.py --document-chars 10000000 --strings 5000000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from kokoro_onnx.config import MAX_PHONEME_LENGTH
+from kokoro_onnx.tokenizer import Tokenizer
+
+
+def per_char_tokenize(vocab: dict, phonemes: str):
+    return np.array(
+        [i for i in map(vocab.get, phonemes) if i is not None], dtype=np.int64
+    )
+
+
+def per_char_filter(vocab: dict, phonemes: str) -> str:
+    return "".join(filter(lambda p: p in vocab, phonemes))
+
+
+def timed(name: str, fn, items: list[str], chars: int):
+    start_t = time.perf_counter()
+    for item in items:
+        fn(item)
+    elapsed = time.perf_counter() - start_t
+    print(f"  {name:<24} {elapsed:>8.3f}s  {chars / elapsed / 1e6:>8.1f}M chars/s")
+
+
+def main():
+    parser = argparse.ArgumentParser("Benchmark tokenizer")
+    parser.add_argument("--document-chars", type=int, default=2_000_000)
+    parser.add_argument("--strings", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tokenizer = Tokenizer()
+    vocab = tokenizer.vocab
+    rng = random.Random(args.seed)
+    # Mostly vocab symbols with some that get stripped, like raw espeak output
+    symbols = list(vocab) * 10 + ["̃", "-", "‍"]
+
+    document = "".join(rng.choices(symbols, k=args.document_chars))
+    chunks = [
+        document[i : i + MAX_PHONEME_LENGTH]
+        for i in range(0, len(document), MAX_PHONEME_LENGTH)
+    ]
+    print(f"Document of {len(document)} chars")
+    timed(
+        "filter per char",
+        lambda s: per_char_filter(vocab, s),
+        [document],
+        len(document),
+    )
+    timed("filter vectorized", tokenizer.filter_phonemes, [document], len(document))
+    timed(
+        "tokenize per char",
+        lambda s: per_char_tokenize(vocab, s),
+        chunks,
+        len(document),
+    )
+    timed("tokenize vectorized", tokenizer.tokenize, chunks, len(document))
+
+    strings = [
+        "".join(rng.choices(symbols, k=rng.randint(5, 40))) for _ in range(args.strings)
+    ]
+    chars = sum(map(len, strings))
+    print(f"{len(strings)} short strings, {chars} chars")
+    timed("filter per char", lambda s: per_char_filter(vocab, s), strings, chars)
+    timed("filter vectorized", tokenizer.filter_phonemes, strings, chars)
+    timed("tokenize per char", lambda s: per_char_tokenize(vocab, s), strings, chars)
+    timed("tokenize vectorized", tokenizer.tokenize, strings, chars)
+
+
+if __name__ == "__main__":
+    main()
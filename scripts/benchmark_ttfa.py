@@ -0,0 +1,64 @@
+"""
+Measure time to first audio of Kokoro.create_stream with the default and the low latency chunking policy.
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+uv run scripts/benchmark_ttfa.py
+"""
+
+import argparse
+import asyncio
+import time
+
+from kokoro_onnx import Kokoro
+
+PARAGRAPH = (
+    "The sky above the port was the color of television, tuned to a dead channel. "
+    "It's not like I'm using, Case heard someone say, as he shouldered his way through the crowd. "
+    "It's like my body's developed this massive drug deficiency. "
+)
+
+
+async def measure(
+    kokoro: Kokoro, text: str, voice: str, **kwargs
+) -> tuple[float, float]:
+    """Returns time to first audio and total time"""
+    start_t = time.perf_counter()
+    first_audio = None
+    async for _ in kokoro.create_stream(text, voice, **kwargs):
+        if first_audio is None:
+            first_audio = time.perf_counter() - start_t
+    return first_audio, time.perf_counter() - start_t
+
+
+async def main():
+    parser = argparse.ArgumentParser("Benchmark time to first audio")
+    parser.add_argument("--model", default="kokoro-v1.0.onnx")
+    parser.add_argument("--voices", default="voices-v1.0.bin")
+    parser.add_argument("--voice", default="af_sarah")
+    parser.add_argument("--paragraphs", type=int, default=5)
+    parser.add_argument("--first_chunk_phonemes", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    kokoro = Kokoro(args.model, args.voices)
+    text = PARAGRAPH * args.paragraphs
+    # Warm up the session and espeak before timing
+    kokoro.create(PARAGRAPH, args.voice)
+
+    policies = {
+        "default": {},
+        "low latency": {"first_chunk_phonemes": args.first_chunk_phonemes},
+    }
+    for name, kwargs in policies.items():
+        results = [
+            await measure(kokoro, text, args.voice, **kwargs)
+            for _ in range(args.repeat)
+        ]
+        first_audio = min(r[0] for r in results)
+        total = min(r[1] for r in results)
+        print(f"{name:<12} first audio {first_audio:.3f}s, total {total:.3f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,30 @@
+"""
+Convert an npz voices file to a memory mapped voice store.
+Voices in the store are paged in on demand and shared between processes through the page cache.
+
+wget https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin
+uv run scripts/convert_voices.py voices-v1.0.bin voices-v1.0.store
+
+Then use it in place of the voices file: Kokoro("kokoro-v1.0.onnx", "voices-v1.0.store")
+"""
+
+import argparse
+import os
+
+from kokoro_onnx.voices import VoiceStore, convert_voices
+
+
+def main():
+    parser = argparse.ArgumentParser("Convert voices to a voice store")
+    parser.add_argument("voices_path", help="npz voices file, e.g. voices-v1.0.bin")
+    parser.add_argument("output_path", help="voice store to create")
+    args = parser.parse_args()
+
+    convert_voices(args.voices_path, args.output_path)
+    store = VoiceStore(args.output_path)
+    mb_size = os.path.getsize(args.output_path) // 1000 // 1000
+    print(f"Created {args.output_path} with {len(store)} voices ({mb_size}MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Load test a running kokoro-onnx-server: requests per second, time to first byte and total latency.
+
+kokoro-onnx-server --model kokoro-v1.0.onnx --voices voices-v1.0.bin --pool_size 2
+uv run scripts/load_test.py
+uv run scripts/load_test.py --requests 200 --concurrency 8 --format pcm
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+TEXT = (
+    "The sky above the port was the color of television, tuned to a dead channel. "
+    "It's not like I'm using, Case heard someone say, as he shouldered his way through the crowd."
+)
+
+
+async def speech_request(
+    host: str, port: int, payload: dict
+) -> tuple[int, float | None, float, int]:
+    """
+    Returns status, time to first audio byte, total time and audio bytes
+    """
+    body = json.dumps(payload).encode()
+    start_t = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(
+            (
+                f"POST /v1/audio/speech HTTP/1.1\r\nHost: {host}:{port}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode()
+            + body
+        )
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        headers = head.decode("latin-1").lower()
+        first_byte = None
+        size = 0
+        if "transfer-encoding: chunked" in headers:
+            while True:
+                chunk_size = int((await reader.readline()).strip(), 16)
+                if chunk_size == 0:
+                    break
+                size += len(await reader.readexactly(chunk_size))
+                if first_byte is None:
+                    first_byte = time.perf_counter() - start_t
+                await reader.readline()
+        else:
+            await reader.read()
+        return status, first_byte, time.perf_counter() - start_t, size
+    finally:
+        writer.close()
+
+
+def percentiles(values: list[float]) -> str:
+    if len(values) < 2:
+        return "n/a"
+    q = statistics.quantiles(values, n=100)
+    return (
+        f"p50 {q[49] * 1000:.0f}ms  p95 {q[94] * 1000:.0f}ms  p99 {q[98] * 1000:.0f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser("Load test kokoro-onnx-server")
+    parser.add_argument("--url", default="http://127.0.0.1:8880")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--voice", default="af_sarah")
+    parser.add_argument("--format", default="pcm")
+    parser.add_argument("--text", default=TEXT)
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    payload = {
+        "model": "kokoro",
+        "input": args.text,
+        "voice": args.voice,
+        "response_format": args.format,
+    }
+    pending = iter(range(args.requests))
+    results = []
+
+    async def worker():
+        for _ in pending:
+            try:
+                results.append(await speech_request(url.hostname, url.port, payload))
+            except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                results.append((type(e).__name__, None, 0.0, 0))
+
+    start_t = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start_t
+
+    ok = [r for r in results if r[0] == 200]
+    print(f"{len(results)} requests with concurrency {args.concurrency}")
+    print(f"Status: {dict(Counter(r[0] for r in results))}")
+    print(f"Requests/sec: {len(ok) / elapsed:.2f}")
+    print(f"Time to first byte: {percentiles([r[1] for r in ok if r[1] is not None])}")
+    print(f"Total latency: {percentiles([r[2] for r in ok])}")
+    print(f"Audio: {sum(r[3] for r in ok) / 1024 / 1024:.1f}MB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
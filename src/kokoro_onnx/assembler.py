@@ -0,0 +1,75 @@
+import numpy as np
+from numpy.typing import NDArray
+
+from .config import SAMPLE_RATE
+from .log import log
+
+# Rough number of samples the model creates per token at speed 1.0, used to size the output up front
+SAMPLES_PER_TOKEN = 1600
+
+
+class AudioAssembler:
+    """
+    Output timeline that chunks are written into as they're created, instead of collecting them
+    and concatenating at the end, which briefly holds two copies of long audio.
+    The buffer is preallocated from an estimate of the length and grown in place when it's exceeded.
+    Neighbouring chunks overlap by crossfade samples with an equal-power crossfade, for joins without clicks.
+    """
+
+    def __init__(self, capacity: int, crossfade: int = 0):
+        self.buffer = np.empty(max(capacity, 1), dtype=np.float32)
+        self.length = 0
+        self.crossfade = crossfade
+        self._curves = self._fade_curves(crossfade)
+
+    @staticmethod
+    def _fade_curves(length: int) -> tuple[NDArray[np.float32], NDArray[np.float32]]:
+        """
+        Equal-power fade in and fade out curves, fade_in**2 + fade_out**2 == 1
+        """
+        t = (np.arange(length, dtype=np.float32) + 0.5) / max(length, 1) * np.pi / 2
+        return np.sin(t), np.cos(t)
+
+    @classmethod
+    def for_tokens(
+        cls, tokens: int, speed: float = 1.0, crossfade: float = 0.0
+    ) -> "AudioAssembler":
+        """
+        Assembler sized for audio of that many tokens at speed, crossfade is in seconds
+        """
+        return cls(
+            int(tokens * SAMPLES_PER_TOKEN / speed), int(crossfade * SAMPLE_RATE)
+        )
+
+    def _reserve(self, length: int):
+        if length <= len(self.buffer):
+            return
+        capacity = max(length, int(len(self.buffer) * 1.5))
+        log.debug(
+            f"Growing output buffer from {len(self.buffer)} to {capacity} samples"
+        )
+        # In place, no views of the buffer exist until result()
+        self.buffer.resize(capacity, refcheck=False)
+
+    def append(self, audio: NDArray[np.float32]):
+        overlap = min(self.crossfade, self.length, len(audio))
+        self._reserve(self.length + len(audio) - overlap)
+        if overlap:
+            fade_in, fade_out = (
+                self._curves
+                if overlap == self.crossfade
+                else self._fade_curves(overlap)
+            )
+            joint = self.buffer[self.length - overlap : self.length]
+            joint *= fade_out
+            joint += audio[:overlap] * fade_in
+        end = self.length + len(audio) - overlap
+        self.buffer[self.length : end] = audio[overlap:]
+        self.length = end
+
+    def result(self) -> NDArray[np.float32]:
+        """
+        The assembled audio, the buffer is shrunk to it in place so no unused capacity stays allocated
+        """
+        self.buffer.resize(self.length, refcheck=False)
+        return self.buffer
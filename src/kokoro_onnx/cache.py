@@ -0,0 +1,285 @@
+import atexit
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Generic, TypeVar
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .log import log
+
+T = TypeVar("T")
+
+
+@dataclass
+class CacheStats:
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache(Generic[T]):
+    """
+    Thread safe, size bounded least recently used cache with hit/miss/eviction counters.
+    With weigh the size is the sum of the weights of the items (e.g. bytes) instead of their count.
+    """
+
+    def __init__(self, maxsize: int = 128, weigh: Callable[[T], int] | None = None):
+        self.maxsize = maxsize
+        self._weigh = weigh or (lambda _: 1)
+        self._items: OrderedDict[Hashable, T] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> T | None:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self._hits += 1
+                return self._items[key]
+            self._misses += 1
+            return None
+
+    def put(self, key: Hashable, value: T):
+        if self._weigh(value) > self.maxsize:
+            return
+        with self._lock:
+            if key in self._items:
+                self._size -= self._weigh(self._items.pop(key))
+            self._items[key] = value
+            self._size += self._weigh(value)
+            while self._size > self.maxsize:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= self._weigh(evicted)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                size=self._size,
+                maxsize=self.maxsize,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+            )
+
+
+class AudioCache:
+    """
+    Synthesized audio keyed on a hash of the model inputs, so repeated chunks skip the model.
+    Audio is kept in an in-memory LRU tier bounded by memory_bytes, and optionally in an on-disk
+    tier at disk_path: raw float32 or int16 blobs opened with np.memmap plus a small JSON index,
+    bounded by disk_bytes. The cache can be shared by several Kokoro instances.
+    The index is written at most every index_interval seconds instead of on every put,
+    and once more at exit (or on flush()), so a crash loses at most the last interval of entries.
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int = 256 * 1024 * 1024,
+        disk_path: str | None = None,
+        disk_bytes: int = 4 * 1024 * 1024 * 1024,
+        disk_dtype: str = "float32",
+        index_interval: float = 1.0,
+    ):
+        assert disk_dtype in ("float32", "int16"), (
+            "disk_dtype should be float32 or int16"
+        )
+        self.memory: LRUCache[NDArray[np.float32]] = LRUCache(
+            memory_bytes, weigh=lambda audio: audio.nbytes
+        )
+        self.disk_path = Path(disk_path) if disk_path else None
+        self.disk_bytes = disk_bytes
+        self.disk_dtype = np.dtype(disk_dtype)
+        self._lock = threading.Lock()
+        self._disk_hits = 0
+        self._disk_misses = 0
+        self._disk_evictions = 0
+        # key -> [size in bytes, last access time]
+        self._index: dict[str, list] = {}
+        self._disk_size = 0
+        self.index_interval = index_interval
+        self._index_dirty = False
+        self._index_saved = time.monotonic()
+        # Serializes index writes, which happen outside self._lock
+        self._save_lock = threading.Lock()
+        if self.disk_path:
+            self.disk_path.mkdir(parents=True, exist_ok=True)
+            index_path = self.disk_path / "index.json"
+            if index_path.exists():
+                with open(index_path, encoding="utf-8") as fp:
+                    self._index = json.load(fp)
+            self._disk_size = sum(size for size, _ in self._index.values())
+            atexit.register(self.flush)
+
+    @staticmethod
+    def key(
+        input_ids: NDArray[np.int64],
+        style: NDArray[np.float32],
+        speed: float,
+        model_id: str,
+        bucket_len: int | None = None,
+    ) -> str:
+        """
+        bucket_len is the padded length the chunk ran at, padding changes the audio slightly
+        """
+        digest = hashlib.sha256()
+        digest.update(model_id.encode())
+        digest.update(np.ascontiguousarray(input_ids, dtype=np.int64).tobytes())
+        if bucket_len is not None:
+            digest.update(np.int64(bucket_len).tobytes())
+        # The style vector itself rather than the voice name, so blended voices work too
+        digest.update(np.ascontiguousarray(style, dtype=np.float32).tobytes())
+        digest.update(np.float64(speed).tobytes())
+        return digest.hexdigest()
+
+    def _blob_path(self, key: str) -> Path:
+        return self.disk_path / f"{key}.{self.disk_dtype.name}"
+
+    def get(self, key: str) -> NDArray[np.float32] | None:
+        audio = self.memory.get(key)
+        if audio is not None or not self.disk_path:
+            return audio
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                self._disk_misses += 1
+                return None
+            entry[1] = time.time()
+            self._index_dirty = True
+        try:
+            mapped = np.memmap(self._blob_path(key), dtype=self.disk_dtype, mode="r")
+        except (OSError, ValueError):
+            log.warning(
+                f"Audio cache blob {key} is missing, dropping it from the index"
+            )
+            with self._lock:
+                entry = self._index.pop(key, None)
+                if entry is not None:
+                    self._disk_size -= entry[0]
+                    self._index_dirty = True
+            return None
+        if self.disk_dtype == np.int16:
+            audio = (mapped / 32767).astype(np.float32)
+        else:
+            # Keep a copy rather than the mapping in the memory tier, a mapped blob
+            # can't be replaced or evicted on Windows
+            audio = np.array(mapped)
+        del mapped
+        with self._lock:
+            self._disk_hits += 1
+        self._remember(key, audio)
+        return audio
+
+    def put(self, key: str, audio: NDArray[np.float32]):
+        audio = np.array(audio, dtype=np.float32)
+        self._remember(key, audio)
+        if not self.disk_path or not len(audio):
+            return
+        if self.disk_dtype == np.int16:
+            blob = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+        else:
+            blob = audio
+        blob_path = self._blob_path(key)
+        # Write next to the blob first, so readers never map a partial file
+        tmp_path = blob_path.with_name(
+            f"{blob_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            blob.tofile(tmp_path)
+            os.replace(tmp_path, blob_path)
+        except OSError as e:
+            # The audio is already created and in the memory tier, don't fail the caller over the disk tier
+            log.warning(f"Couldn't write audio cache blob {key}: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            return
+        with self._lock:
+            previous = self._index.get(key)
+            if previous is not None:
+                self._disk_size -= previous[0]
+            self._index[key] = [blob.nbytes, time.time()]
+            self._disk_size += blob.nbytes
+            self._index_dirty = True
+            if self._disk_size > self.disk_bytes:
+                self._evict_disk()
+            due = time.monotonic() - self._index_saved >= self.index_interval
+        if due:
+            self.flush()
+
+    def _remember(self, key: str, audio: NDArray[np.float32]):
+        # Callers get views of cached audio, make sure they can't change it
+        audio.flags.writeable = False
+        self.memory.put(key, audio)
+
+    def _evict_disk(self):
+        # Least recently used first, down to 90% of the budget so the next puts don't sort again
+        target = self.disk_bytes * 0.9
+        for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._disk_size <= target:
+                break
+            self._index.pop(key)
+            self._disk_evictions += 1
+            self._disk_size -= size
+            try:
+                os.remove(self._blob_path(key))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                # e.g. still mapped by a reader on Windows, it's dropped from the index either way
+                log.warning(f"Couldn't remove evicted audio cache blob {key}: {e}")
+
+    def flush(self):
+        """
+        Write the disk index if it changed since it was last written
+        """
+        if not self.disk_path:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._index_dirty:
+                    return
+                data = json.dumps(self._index)
+                self._index_dirty = False
+                self._index_saved = time.monotonic()
+            index_path = self.disk_path / "index.json"
+            tmp_path = index_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as fp:
+                fp.write(data)
+            os.replace(tmp_path, index_path)
+
+    def disk_stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                size=self._disk_size,
+                maxsize=self.disk_bytes,
+                hits=self._disk_hits,
+                misses=self._disk_misses,
+                evictions=self._disk_evictions,
+            )
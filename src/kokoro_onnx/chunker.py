@@ -0,0 +1,178 @@
+"""
+Strategies that split phonemes into chunks, each chunk is one session run.
+"""
+
+import re
+from dataclasses import dataclass
+
+from .config import MAX_PHONEME_LENGTH
+
+# A clause runs up to and including its punctuation marks
+CLAUSE_PATTERN = re.compile(r"[^.,!?;]*[.,!?;]+|[^.,!?;]+")
+CLAUSE_END = ".,!?;"
+
+
+@dataclass
+class Chunker:
+    """
+    Split phonemes into chunks of at most max_tokens tokens for Kokoro(chunker=...)
+    Chunks end at clause boundaries (punctuation marks), at spaces between words when a clause doesn't fit,
+    and only a single word longer than a chunk is cut, so nothing is left for the session to truncate.
+    Phonemes must be filtered against the vocab (Tokenizer.filter_phonemes), so each character is one token.
+
+    balance: keep the smallest number of chunks but even out their lengths, e.g. 256 + 256 instead of 500 + 12.
+    first_chunk_tokens: end the first chunk at the first clause boundary, or at a space before that many tokens,
+    and grow the following chunks by growth up to max_tokens, so streaming can start playing sooner.
+
+    Subclass and override split for other strategies (and split_incremental if it balances).
+    """
+
+    # The voice style is picked by token count from MAX_PHONEME_LENGTH rows
+    max_tokens: int = MAX_PHONEME_LENGTH - 1
+    balance: bool = True
+    first_chunk_tokens: int | None = None
+    growth: float = 2.0
+
+    def __post_init__(self):
+        assert self.max_tokens >= 1, "max_tokens should be at least 1"
+        assert self.growth >= 1, "growth should be at least 1"
+
+    @classmethod
+    def throughput(cls) -> "Chunker":
+        """
+        Fewest session runs with even chunk lengths, for create and create_batch
+        """
+        return cls(balance=True)
+
+    @classmethod
+    def latency(cls, first_chunk_tokens: int = 50, growth: float = 2.0) -> "Chunker":
+        """
+        Short first chunk and growing chunks after it, for a low time to first audio with create_stream
+        """
+        return cls(balance=False, first_chunk_tokens=first_chunk_tokens, growth=growth)
+
+    def split(self, phonemes: str, emitted: int = 0) -> list[str]:
+        """
+        emitted is the number of chunks already created from earlier text when splitting incrementally
+        """
+        units = self._units(phonemes)
+        if self.first_chunk_tokens:
+            chunks = self._pack_growing(units, emitted)
+        else:
+            max_tokens = self._balanced_max(units) if self.balance else self.max_tokens
+            chunks = self._pack(units, max_tokens)
+        return [" ".join(chunk) for chunk in chunks]
+
+    def split_incremental(self, phonemes: str, emitted: int = 0) -> list[str]:
+        """
+        Split phonemes that more phonemes may follow, every chunk but the last is taken as final.
+        Balancing would spread the text seen so far over shorter chunks and release them, so the
+        balanced strategy packs greedily here, which gives as few chunks as splitting the whole text at once.
+        """
+        if (
+            not self.balance
+            or self.first_chunk_tokens
+            or type(self).split is not Chunker.split
+        ):
+            return self.split(phonemes, emitted)
+        return [
+            " ".join(chunk)
+            for chunk in self._pack(self._units(phonemes), self.max_tokens)
+        ]
+
+    def _units(self, phonemes: str) -> list[str]:
+        """
+        Clauses, with the ones longer than max_tokens split into words and words longer than that cut
+        """
+        units = []
+        for clause in CLAUSE_PATTERN.findall(phonemes):
+            clause = clause.strip()
+            if len(clause) <= self.max_tokens:
+                if clause:
+                    units.append(clause)
+                continue
+            for word in clause.split():
+                units.extend(
+                    word[i : i + self.max_tokens]
+                    for i in range(0, len(word), self.max_tokens)
+                )
+        return units
+
+    @staticmethod
+    def _pack(units: list[str], max_tokens: int) -> list[list[str]]:
+        """
+        Fill chunks in order up to max_tokens, which gives the fewest chunks
+        """
+        chunks: list[list[str]] = []
+        current: list[str] = []
+        size = 0
+        for unit in units:
+            # Units are joined with a space, which is a token too
+            added = len(unit) + bool(current)
+            if current and size + added > max_tokens:
+                chunks.append(current)
+                current, size, added = [], 0, len(unit)
+            current.append(unit)
+            size += added
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _balanced_max(self, units: list[str]) -> int:
+        """
+        Smallest chunk length that still packs units into the fewest chunks
+        """
+        if not units:
+            return self.max_tokens
+        count = len(self._pack(units, self.max_tokens))
+        low, high = max(map(len, units)), self.max_tokens
+        while low < high:
+            middle = (low + high) // 2
+            if len(self._pack(units, middle)) <= count:
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def _chunk_limit(self, index: int) -> int:
+        """
+        Token limit of the chunk at index, first_chunk_tokens grown by growth per chunk up to max_tokens
+        """
+        # Stop growing at max_tokens, growth ** index overflows for long streams
+        limit = float(self.first_chunk_tokens)
+        for _ in range(index):
+            if limit >= self.max_tokens or self.growth == 1:
+                break
+            limit *= self.growth
+        # At least one token, so every chunk makes progress
+        return max(1, min(self.max_tokens, int(limit)))
+
+    def _pack_growing(self, units: list[str], emitted: int) -> list[list[str]]:
+        chunks: list[list[str]] = []
+        current: list[str] = []
+        size = 0
+        stack = units[::-1]
+        while stack:
+            unit = stack.pop()
+            max_tokens = self._chunk_limit(emitted + len(chunks))
+            added = len(unit) + bool(current)
+            if size + added <= max_tokens:
+                current.append(unit)
+                size += added
+                if not emitted and not chunks and unit[-1] in CLAUSE_END:
+                    # End the first chunk at the first clause boundary
+                    chunks.append(current)
+                    current, size = [], 0
+            elif current:
+                chunks.append(current)
+                current, size = [], 0
+                stack.append(unit)
+            elif " " in unit:
+                # A clause longer than the chunk, continue word by word
+                stack.extend(unit.split()[::-1])
+            else:
+                stack.append(unit[max_tokens:])
+                chunks.append([unit[:max_tokens]])
+        if current:
+            chunks.append(current)
+        return chunks
@@ -1,9 +1,14 @@
+import functools
 import json
 from dataclasses import dataclass
 from pathlib import Path
 
 MAX_PHONEME_LENGTH = 510
 SAMPLE_RATE = 24000
+# Number of waveform samples the model produces per predicted duration frame
+SAMPLES_PER_FRAME = 600
+# Suggested input lengths for Kokoro(bucket_lengths=...), the largest fits MAX_PHONEME_LENGTH + 2 pad tokens
+BUCKET_LENGTHS = [64, 128, 256, 512]
 
 
 @dataclass
@@ -38,10 +43,15 @@ class KoKoroConfig:
             raise FileNotFoundError(error_msg)
 
 
-def get_vocab():
+@functools.cache
+def get_vocab() -> dict[str, int]:
     with open(Path(__file__).parent / "config.json", encoding="utf-8") as fp:
         config = json.load(fp)
         return config["vocab"]
 
 
-DEFAULT_VOCAB = get_vocab()
+def __getattr__(name: str):
+    # DEFAULT_VOCAB is read from config.json on first access instead of at import
+    if name == "DEFAULT_VOCAB":
+        return get_vocab()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,330 @@
+"""
+Encoders that turn float32 audio from Kokoro.create and Kokoro.create_stream into bytes ready to send.
+
+PCM16, mu-law, A-law and WAV are converted with vectorized numpy into buffers that are reused across chunks,
+and encode returns a memoryview of them, so chunks go to sockets and files without extra copies.
+The memoryview is valid until the next encode call, write it out (or copy it) before that.
+Opus in an Ogg container needs the optional soundfile dependency, install with kokoro-onnx[opus].
+"""
+
+import functools
+import io
+import struct
+from collections.abc import AsyncGenerator
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .config import SAMPLE_RATE
+
+# Sample rates Opus encodes natively
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+# WAV size fields for a stream of unknown length, readers take them as "until the end"
+WAV_UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+class AudioEncoder:
+    """
+    Base encoder, subclass and override encode (and header, flush) for other formats.
+    header is sent before the first chunk and flush after the last one.
+    """
+
+    content_type = "application/octet-stream"
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+
+    def header(self, length: int | None = None) -> bytes:
+        """
+        length is the number of samples, when it's known up front
+        """
+        return b""
+
+    def encode(self, samples: NDArray[np.float32]) -> bytes | memoryview:
+        raise NotImplementedError
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class PCM16Encoder(AudioEncoder):
+    """
+    Raw little-endian signed 16-bit PCM
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        super().__init__(sample_rate)
+        self.content_type = f"audio/L16; rate={sample_rate}; channels=1"
+        self._scratch = np.empty(0, dtype=np.float32)
+        self._pcm = np.empty(0, dtype="<i2")
+
+    def _to_pcm16(self, samples: NDArray[np.float32]) -> NDArray[np.int16]:
+        size = len(samples)
+        if size > len(self._scratch):
+            # Grow with headroom, later chunks are usually about as long
+            capacity = max(size, int(len(self._scratch) * 1.5))
+            self._scratch = np.empty(capacity, dtype=np.float32)
+            self._pcm = np.empty(capacity, dtype="<i2")
+        scratch = self._scratch[:size]
+        pcm = self._pcm[:size]
+        # Scale to full range, clip anything out of -1.0..1.0 and round to the nearest sample
+        np.multiply(samples, 32767, out=scratch)
+        np.clip(scratch, -32768, 32767, out=scratch)
+        np.rint(scratch, out=scratch)
+        np.copyto(pcm, scratch, casting="unsafe")
+        return pcm
+
+    def encode(self, samples: NDArray[np.float32]) -> memoryview:
+        return memoryview(self._to_pcm16(samples)).cast("B")
+
+
+@functools.cache
+def _mulaw_table() -> NDArray[np.uint8]:
+    """
+    G.711 mu-law byte of every 16-bit sample, indexed by the sample's bits as uint16
+    """
+    pcm = np.arange(1 << 16, dtype=np.uint16).view(np.int16).astype(np.int32) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(pcm), 8159) + (0x84 >> 2)
+    segment = np.searchsorted(
+        [0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF], magnitude
+    )
+    value = np.where(
+        segment >= 8, 0x7F, (segment << 4) | ((magnitude >> (segment + 1)) & 0xF)
+    )
+    return (value ^ mask).astype(np.uint8)
+
+
+@functools.cache
+def _alaw_table() -> NDArray[np.uint8]:
+    """
+    G.711 A-law byte of every 16-bit sample, indexed by the sample's bits as uint16
+    """
+    pcm = np.arange(1 << 16, dtype=np.uint16).view(np.int16).astype(np.int32) >> 3
+    mask = np.where(pcm >= 0, 0xD5, 0x55)
+    magnitude = np.where(pcm >= 0, pcm, -pcm - 1)
+    segment = np.searchsorted(
+        [0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF], magnitude
+    )
+    shift = np.maximum(segment, 1)
+    value = np.where(segment >= 8, 0x7F, (segment << 4) | ((magnitude >> shift) & 0xF))
+    return (value ^ mask).astype(np.uint8)
+
+
+class MuLawEncoder(PCM16Encoder):
+    """
+    G.711 mu-law, one byte per sample, e.g. for telephony
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        super().__init__(sample_rate)
+        self.content_type = f"audio/basic; rate={sample_rate}"
+        self._table = _mulaw_table()
+        self._bytes = np.empty(0, dtype=np.uint8)
+
+    def encode(self, samples: NDArray[np.float32]) -> memoryview:
+        pcm = self._to_pcm16(samples)
+        if len(self._bytes) < len(self._pcm):
+            self._bytes = np.empty(len(self._pcm), dtype=np.uint8)
+        out = self._bytes[: len(pcm)]
+        # One table lookup per sample, mode="clip" lets take write into out without a temporary
+        np.take(self._table, pcm.view(np.uint16), out=out, mode="clip")
+        return memoryview(out)
+
+
+class ALawEncoder(MuLawEncoder):
+    """
+    G.711 A-law, one byte per sample, e.g. for telephony
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        super().__init__(sample_rate)
+        self.content_type = f"audio/x-alaw-basic; rate={sample_rate}"
+        self._table = _alaw_table()
+
+
+class WavEncoder(PCM16Encoder):
+    """
+    16-bit PCM WAV. Without a length, the header has the size fields of a stream of unknown length,
+    so it can be sent before the audio is created.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        super().__init__(sample_rate)
+        self.content_type = "audio/wav"
+
+    def header(self, length: int | None = None) -> bytes:
+        if length is None:
+            riff_size = data_size = WAV_UNKNOWN_SIZE
+        else:
+            data_size = length * 2
+            riff_size = 36 + data_size
+        return struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF",
+            riff_size,
+            b"WAVE",
+            b"fmt ",
+            16,
+            1,  # PCM
+            1,  # Channels
+            self.sample_rate,
+            self.sample_rate * 2,  # Bytes per second
+            2,  # Block align
+            16,  # Bits per sample
+            b"data",
+            data_size,
+        )
+
+
+class _PageSink:
+    """
+    Write only file for libsndfile, hands out what was written since the last take()
+    """
+
+    def __init__(self):
+        self.position = 0
+        self._parts: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return b""
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        # libsndfile only asks for the length when it opens the file, Ogg is written front to back
+        position = offset if whence == io.SEEK_SET else self.position + offset
+        if position != self.position:
+            raise io.UnsupportedOperation("Streamed output can't seek")
+        return position
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+class OpusEncoder(AudioEncoder):
+    """
+    Opus in an Ogg container, through libsndfile. Pages are returned as soon as libsndfile writes them.
+    compression_level is from 0.0 (highest bitrate) to 1.0 (lowest bitrate), None keeps libsndfile's default.
+    """
+
+    content_type = "audio/ogg; codecs=opus"
+
+    def __init__(
+        self, sample_rate: int = SAMPLE_RATE, compression_level: float | None = None
+    ):
+        try:
+            import soundfile
+        except ImportError as e:
+            raise ImportError(
+                "Opus encoding requires soundfile, install it with: pip install kokoro-onnx[opus]"
+            ) from e
+        if sample_rate not in OPUS_SAMPLE_RATES:
+            raise ValueError(
+                f"Opus supports sample rates {OPUS_SAMPLE_RATES}, got {sample_rate}"
+            )
+        super().__init__(sample_rate)
+        self.compression_level = compression_level
+        self._soundfile = soundfile
+        self._sink = _PageSink()
+        self._file = None
+
+    def _open(self):
+        self._sink = _PageSink()
+        kwargs = {}
+        if self.compression_level is not None:
+            kwargs["compression_level"] = self.compression_level
+        self._file = self._soundfile.SoundFile(
+            self._sink,
+            mode="w",
+            samplerate=self.sample_rate,
+            channels=1,
+            format="OGG",
+            subtype="OPUS",
+            **kwargs,
+        )
+
+    def header(self, length: int | None = None) -> bytes:
+        self._open()
+        return self._sink.take()
+
+    def encode(self, samples: NDArray[np.float32]) -> bytes:
+        if self._file is None:
+            self._open()
+        self._file.write(samples)
+        return self._sink.take()
+
+    def flush(self) -> bytes:
+        if self._file is None:
+            return b""
+        # Closing writes the last pages and the end of stream flag
+        self._file.close()
+        self._file = None
+        return self._sink.take()
+
+
+ENCODERS: dict[str, type[AudioEncoder]] = {
+    "pcm": PCM16Encoder,
+    "wav": WavEncoder,
+    "mulaw": MuLawEncoder,
+    "alaw": ALawEncoder,
+    "opus": OpusEncoder,
+}
+
+
+def get_encoder(name: str, sample_rate: int = SAMPLE_RATE) -> AudioEncoder:
+    """
+    Encoder by format name, one of ENCODERS
+    """
+    if name not in ENCODERS:
+        raise ValueError(
+            f"Unknown audio format {name}, supported formats: {', '.join(ENCODERS)}"
+        )
+    return ENCODERS[name](sample_rate)
+
+
+def _check_sample_rate(encoder: AudioEncoder, sample_rate: int):
+    if sample_rate != encoder.sample_rate:
+        raise ValueError(
+            f"Audio has sample rate {sample_rate}, the encoder expects {encoder.sample_rate}"
+        )
+
+
+def encode_audio(
+    samples: NDArray[np.float32], sample_rate: int, encoder: AudioEncoder
+) -> bytes:
+    """
+    Encode the output of Kokoro.create, e.g. encode_audio(*kokoro.create(...), WavEncoder())
+    """
+    _check_sample_rate(encoder, sample_rate)
+    return b"".join(
+        [encoder.header(len(samples)), encoder.encode(samples), encoder.flush()]
+    )
+
+
+async def encode_stream(
+    stream: AsyncGenerator[tuple[NDArray[np.float32], int], None],
+    encoder: AudioEncoder,
+) -> AsyncGenerator[bytes | memoryview, None]:
+    """
+    Encode the output of Kokoro.create_stream chunk by chunk, starting with the header
+    """
+    header = encoder.header()
+    if header:
+        yield header
+    async for samples, sample_rate in stream:
+        _check_sample_rate(encoder, sample_rate)
+        data = encoder.encode(samples)
+        if len(data):
+            yield data
+    tail = encoder.flush()
+    if tail:
+        yield tail
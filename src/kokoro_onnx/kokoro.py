@@ -0,0 +1,880 @@
+import asyncio
+import contextlib
+import dataclasses
+import importlib.util
+import itertools
+import json
+import logging
+import os
+import platform
+import re
+import time
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    Mapping,
+)
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import onnxruntime as rt
+from numpy.typing import NDArray
+
+from .assembler import AudioAssembler
+from .cache import AudioCache
+from .chunker import Chunker
+from .config import (
+    BUCKET_LENGTHS,
+    MAX_PHONEME_LENGTH,
+    SAMPLE_RATE,
+    SAMPLES_PER_FRAME,
+    EspeakConfig,
+    KoKoroConfig,
+)
+from .log import log
+from .pool import SessionPool
+from .resampler import Resampler, resample
+from .scheduler import BatchScheduler
+from .session import SessionProfile, create_session, optimized_model_path
+from .tokenizer import Tokenizer
+from .trim import fast_trim as trim_audio
+from .voices import load_voices
+
+
+async def _iter_in_executor(items: Iterator[str]) -> AsyncIterator[str]:
+    """
+    Advance a blocking iterator (e.g. one that phonemizes) on the default executor, off the event loop
+    """
+    loop = asyncio.get_running_loop()
+    while (item := await loop.run_in_executor(None, next, items, None)) is not None:
+        yield item
+
+
+async def _prefetch(items: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Fetch the next item in a task while the consumer works on the current one
+    """
+    pending = asyncio.ensure_future(anext(items, None))
+    try:
+        while (item := await pending) is not None:
+            pending = asyncio.ensure_future(anext(items, None))
+            yield item
+    finally:
+        pending.cancel()
+
+
+class Kokoro:
+    def __init__(
+        self,
+        model_path: str,
+        voices_path: str,
+        espeak_config: EspeakConfig | None = None,
+        vocab_config: dict | str | None = None,
+        bucket_lengths: list[int] | None = None,
+        pool_size: int = 1,
+        audio_cache: AudioCache | None = None,
+        io_binding: bool = False,
+        session_profile: SessionProfile | None = None,
+        chunker: Chunker | None = None,
+        scheduler: BatchScheduler | None = None,
+    ):
+        """
+        bucket_lengths: opt-in list of input lengths (e.g. config.BUCKET_LENGTHS) that token sequences are padded to,
+        so ONNX Runtime sees a few fixed shapes and can reuse its memory plans across calls.
+        pool_size: number of sessions concurrent create/create_stream calls check out, the CPU cores are split between them.
+        audio_cache: reuse the audio of chunks created before with the same tokens, voice style and speed.
+        io_binding: bind inputs and outputs with ONNX Runtime IOBinding instead of converting them on every run.
+        session_profile: ONNX Runtime threading, graph optimization and memory options,
+        set its optimized_model_dir to cache the optimized graph on disk for fast startup.
+        chunker: how text is split into session runs, defaults to Chunker.throughput().
+        scheduler: batch the chunks of concurrent create and create_stream calls (e.g. in a server) into shared runs.
+        """
+        # Show useful information for bug reports, only looked up when it's shown
+        if log.isEnabledFor(logging.DEBUG):
+            from importlib import metadata
+
+            log.debug(
+                f"koko-onnx version {metadata.version('kokoro-onnx')} on {platform.platform()} {platform.version()}"
+            )
+        self.config = KoKoroConfig(model_path, voices_path, espeak_config)
+        self.config.validate()
+
+        # See list of providers https://github.com/microsoft/onnxruntime/issues/22101#issuecomment-2357667377
+        providers = ["CPUExecutionProvider"]
+
+        # Check if kokoro-onnx installed with kokoro-onnx[gpu] feature (Windows/Linux)
+        gpu_enabled = importlib.util.find_spec("onnxruntime-gpu")
+        if gpu_enabled:
+            providers: list[str] = rt.get_available_providers()
+
+        # Check if ONNX_PROVIDER environment variable was set
+        env_provider = os.getenv("ONNX_PROVIDER")
+        if env_provider:
+            providers = [env_provider]
+
+        log.debug(f"Providers: {providers}")
+        profile = session_profile or SessionProfile()
+        if pool_size > 1 and not profile.intra_op_num_threads:
+            profile = dataclasses.replace(
+                profile,
+                intra_op_num_threads=SessionPool.threads_per_session(pool_size),
+                inter_op_num_threads=1,
+            )
+        # Hash the model once, not once per session of the pool
+        cached_path = optimized_model_path(model_path, providers, profile)
+        self.pool = SessionPool(
+            [
+                create_session(model_path, providers, profile, cached_path)
+                for _ in range(pool_size)
+            ]
+        )
+        self.sess = self.pool.sessions[0]
+        self.voices: Mapping[str, NDArray[np.float32]] = load_voices(voices_path)
+
+        vocab = self._load_vocab(vocab_config)
+        self.tokenizer = Tokenizer(espeak_config, vocab=vocab)
+
+        self.audio_cache = audio_cache
+        self.io_binding = io_binding
+        self.chunker = chunker or Chunker.throughput()
+        self.model_id = self._model_id(model_path)
+        self.bucket_lengths = sorted(bucket_lengths or [])
+        self._resolve_inputs()
+        self._warmup_buckets()
+        self.scheduler = scheduler
+        if scheduler is not None:
+            scheduler.start(self)
+
+    @classmethod
+    def from_session(
+        cls,
+        session: rt.InferenceSession | list[rt.InferenceSession],
+        voices_path: str,
+        espeak_config: EspeakConfig | None = None,
+        vocab_config: dict | str | None = None,
+        bucket_lengths: list[int] | None = None,
+        audio_cache: AudioCache | None = None,
+        io_binding: bool = False,
+        chunker: Chunker | None = None,
+        scheduler: BatchScheduler | None = None,
+    ):
+        """
+        Create from your own session, or a list of sessions to check out concurrent calls from.
+        """
+        instance = cls.__new__(cls)
+        sessions = session if isinstance(session, list) else [session]
+        instance.pool = SessionPool(sessions)
+        instance.sess = sessions[0]
+        instance.config = KoKoroConfig(
+            instance.sess._model_path, voices_path, espeak_config
+        )
+        instance.config.validate()
+        instance.voices = load_voices(voices_path)
+
+        vocab = instance._load_vocab(vocab_config)
+        instance.tokenizer = Tokenizer(espeak_config, vocab=vocab)
+
+        instance.audio_cache = audio_cache
+        instance.io_binding = io_binding
+        instance.chunker = chunker or Chunker.throughput()
+        instance.model_id = instance._model_id(instance.config.model_path)
+        instance.bucket_lengths = sorted(bucket_lengths or [])
+        instance._resolve_inputs()
+        instance._warmup_buckets()
+        instance.scheduler = scheduler
+        if scheduler is not None:
+            scheduler.start(instance)
+        return instance
+
+    def _load_vocab(self, vocab_config: dict | str | None) -> dict:
+        """Load vocabulary from config file or dictionary.
+
+        Args:
+            vocab_config: Path to vocab config file or dictionary containing vocab.
+
+        Returns:
+            Loaded vocabulary dictionary or empty dictionary if no config provided.
+        """
+
+        if isinstance(vocab_config, str):
+            with open(vocab_config, encoding="utf-8") as fp:
+                config = json.load(fp)
+                return config["vocab"]
+        if isinstance(vocab_config, dict):
+            return vocab_config["vocab"]
+        return {}
+
+    @staticmethod
+    def _model_id(model_path: str) -> str:
+        """
+        Identify the model for the audio cache without hashing hundreds of MBs at startup
+        """
+        stat = os.stat(model_path)
+        return f"{os.path.abspath(model_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def _bucket_length(self, input_len: int) -> int:
+        """
+        Smallest bucket that fits input_len, or input_len itself when bucketing is off or no bucket fits
+        """
+        for bucket_len in self.bucket_lengths:
+            if input_len <= bucket_len:
+                return bucket_len
+        return input_len
+
+    def _warmup_buckets(self):
+        """
+        Run one synthetic sequence per bucket so the first real request of each shape
+        doesn't pay for arena allocation and kernel setup.
+        """
+        for bucket_len, sess in itertools.product(
+            self.bucket_lengths, self.pool.sessions
+        ):
+            start_t = time.time()
+            inputs = self._make_inputs(
+                np.zeros((1, bucket_len), dtype=np.int64),
+                np.zeros((1, 256), dtype=np.float32),
+                [1.0],
+            )
+            self._run_session(sess, inputs)
+            log.debug(f"Warmed up bucket {bucket_len} in {time.time() - start_t:.2f}s")
+
+    def warmup(
+        self,
+        lengths: list[int] | None = None,
+        voices: list[str] | None = None,
+        langs: list[str] | None = None,
+        runs: int = 3,
+    ) -> dict[int, list[float]]:
+        """
+        Run synthetic token sequences through every session of the pool so ONNX Runtime allocates
+        its arenas and sets up kernels before the first real request, and initialise the espeak backends.
+
+        lengths: numbers of tokens to run, defaults to the lengths that fill config.BUCKET_LENGTHS.
+        voices: voices whose style rows are used, defaults to the first voice.
+        langs: languages to initialise espeak backends for, e.g. ["en-us"].
+        runs: runs per length, voice and session.
+
+        Returns the seconds each run took per length, the last runs of a length show its steady state latency.
+        """
+        if lengths is None:
+            lengths = [bucket_len - 2 for bucket_len in BUCKET_LENGTHS]
+        voices = voices or list(self.voices)[:1]
+        for lang in langs or []:
+            start_t = time.time()
+            self.tokenizer.phonemize("Hello.", lang)
+            log.debug(f"Warmed up espeak for {lang} in {time.time() - start_t:.2f}s")
+
+        # Real tokens rather than padding, so the predicted durations look like real speech
+        token_ids = np.array(sorted(set(self.tokenizer.vocab.values())), dtype=np.int64)
+        timings: dict[int, list[float]] = {}
+        for length in lengths:
+            length = min(length, MAX_PHONEME_LENGTH)
+            input_len = length + 2
+            input_ids = np.zeros((1, self._bucket_length(input_len)), dtype=np.int64)
+            input_ids[0, 1 : input_len - 1] = np.resize(token_ids, length)
+            timings[length] = []
+            for _, voice, sess in itertools.product(
+                range(runs), voices, self.pool.sessions
+            ):
+                style = self.get_voice_style(voice)
+                inputs = self._make_inputs(
+                    input_ids, style[min(length, len(style) - 1)], [1.0]
+                )
+                start_t = time.perf_counter()
+                self._run_session(sess, inputs)
+                timings[length].append(time.perf_counter() - start_t)
+            log.debug(
+                f"Warmed up {length} tokens, first run {timings[length][0]:.3f}s, last run {timings[length][-1]:.3f}s"
+            )
+        return timings
+
+    def _resolve_inputs(self):
+        """
+        Resolve the session's input schema once instead of on every run
+        """
+        inputs = {i.name: i for i in self.sess.get_inputs()}
+        # Newer export versions name the tokens input input_ids
+        self._ids_name = "input_ids" if "input_ids" in inputs else "tokens"
+        self._speed_dtype = (
+            np.int32 if inputs["speed"].type == "tensor(int32)" else np.float32
+        )
+        self._output_names = [o.name for o in self.sess.get_outputs()]
+        # Batch-capable models have a symbolic batch dimension, they take zero padded input_ids (batch, len)
+        # and must mask the padding themselves, returning waveform (batch, samples) and duration (batch, len).
+        # The durations cut each item's audio out of the padded batch, without them run chunks one by one.
+        self._batch_axis = (
+            not isinstance(inputs[self._ids_name].shape[0], int)
+            and "duration" in self._output_names
+        )
+        # Bucketing cuts the padded audio by the predicted durations, the legacy tokens export has no such output
+        assert not self.bucket_lengths or "duration" in self._output_names, (
+            "bucket_lengths needs a model with a duration output"
+        )
+
+    def _make_inputs(
+        self,
+        input_ids: NDArray[np.int64],
+        style: NDArray[np.float32],
+        speeds: list[float],
+    ) -> dict[str, NDArray]:
+        return {
+            self._ids_name: input_ids,
+            "style": np.ascontiguousarray(style, dtype=np.float32),
+            "speed": np.array(speeds, dtype=self._speed_dtype),
+        }
+
+    def _prepare_inputs(
+        self, phonemes: str, voice: NDArray[np.float32], speed: float
+    ) -> tuple[dict[str, NDArray], int, int]:
+        """
+        Tokenize phonemes and pick the style row for a single session run.
+        Returns the session inputs, the real input length and the (bucket padded) input length.
+        """
+        log.debug("Phonemes: %s", phonemes)
+        if len(phonemes) > MAX_PHONEME_LENGTH:
+            log.warning(
+                f"Phonemes are too long, truncating to {MAX_PHONEME_LENGTH} phonemes"
+            )
+        phonemes = phonemes[:MAX_PHONEME_LENGTH]
+        tokens = self.tokenizer.tokenize(phonemes)
+        assert len(tokens) <= MAX_PHONEME_LENGTH, (
+            f"Context length is {MAX_PHONEME_LENGTH}, but leave room for the pad token 0 at the start & end"
+        )
+
+        voice = voice[len(tokens)]
+        input_len = len(tokens) + 2
+        bucket_len = self._bucket_length(input_len)
+        # [[0, *tokens, 0]] padded up to the bucket length
+        input_ids = np.zeros((1, bucket_len), dtype=np.int64)
+        input_ids[0, 1 : input_len - 1] = tokens
+        inputs = self._make_inputs(input_ids, voice, [speed])
+        return inputs, input_len, bucket_len
+
+    def _run(
+        self,
+        inputs: dict[str, NDArray],
+        input_len: int,
+        bucket_len: int,
+        sess: rt.InferenceSession | None = None,
+    ) -> NDArray[np.float32]:
+        """
+        Run the session and return the waveform without bucket padding.
+        sess is a session the caller already checked out of the pool.
+        """
+        start_t = time.time()
+        cache_key = None
+        if self.audio_cache is not None:
+            cache_key = self.audio_cache.key(
+                inputs[self._ids_name][0, :input_len],
+                inputs["style"],
+                float(inputs["speed"][0]),
+                self.model_id,
+                bucket_len,
+            )
+            audio = self.audio_cache.get(cache_key)
+            if audio is not None:
+                log.debug("Audio cache hit for %d tokens", input_len - 2)
+                return audio
+
+        if sess is not None:
+            outputs = self._run_session(sess, inputs)
+        else:
+            with self.pool.session() as pooled:
+                outputs = self._run_session(pooled, inputs)
+        # Models with a batch axis return (1, num_samples)
+        audio = outputs[0].reshape(-1)
+        if bucket_len != input_len:
+            # Cut off the audio created for the bucket padding
+            duration = outputs[self._output_names.index("duration")].reshape(-1)
+            audio = audio[: int(duration[:input_len].sum()) * SAMPLES_PER_FRAME]
+        audio_duration = len(audio) / SAMPLE_RATE
+        create_duration = time.time() - start_t
+        rtf = create_duration / audio_duration
+        log.debug(
+            "Created audio in length of %.2fs for %d tokens in %.2fs (RTF: %.2f)",
+            audio_duration,
+            input_len - 2,
+            create_duration,
+            rtf,
+        )
+        if cache_key is not None:
+            self.audio_cache.put(cache_key, audio)
+        return audio
+
+    def _run_session(
+        self, sess: rt.InferenceSession, inputs: dict[str, NDArray]
+    ) -> list[NDArray]:
+        if not self.io_binding:
+            return sess.run(None, inputs)
+        binding = sess.io_binding()
+        for name, value in inputs.items():
+            binding.bind_cpu_input(name, value)
+        for name in self._output_names:
+            # Let ONNX Runtime allocate, the waveform length is only known after the run
+            binding.bind_output(name)
+        sess.run_with_iobinding(binding)
+        # numpy views of the output memory ONNX Runtime allocated, no copy
+        return [value.numpy() for value in binding.get_outputs()]
+
+    def _create_audio(
+        self, phonemes: str, voice: NDArray[np.float32], speed: float
+    ) -> tuple[NDArray[np.float32], int]:
+        if self.scheduler is not None:
+            # Blocks this (executor) thread until the chunk's batch ran
+            audio = self.scheduler.submit(phonemes, voice, speed).result()
+        else:
+            audio = self._run(*self._prepare_inputs(phonemes, voice, speed))
+        return audio, SAMPLE_RATE
+
+    def _supports_batch(self) -> bool:
+        """
+        Whether the model was exported with a dynamic batch axis and a duration output.
+        scripts/export.py exports batch size 1 only, the stock Kokoro graph doesn't mask padded items
+        """
+        return self._batch_axis
+
+    def _create_audio_batch(
+        self,
+        batched_phonemes: list[str],
+        voices: list[NDArray[np.float32]],
+        speeds: list[float],
+    ) -> list[NDArray[np.float32]]:
+        """
+        Run several phoneme chunks through a single session call.
+        Token sequences are padded to the longest one and the waveform of each
+        item is cut back to its own length using the model's duration output.
+        """
+        start_t = time.time()
+        tokens = [
+            self.tokenizer.tokenize(phonemes[:MAX_PHONEME_LENGTH])
+            for phonemes in batched_phonemes
+        ]
+        max_len = max(len(t) for t in tokens)
+        input_ids = np.zeros(
+            (len(tokens), self._bucket_length(max_len + 2)), dtype=np.int64
+        )
+        for i, t in enumerate(tokens):
+            input_ids[i, 1 : len(t) + 1] = t
+        style = np.concatenate([voice[len(t)] for voice, t in zip(voices, tokens)])
+        inputs = self._make_inputs(input_ids, style, speeds)
+
+        with self.pool.session() as sess:
+            outputs = sess.run(None, inputs)
+        waveform = outputs[0].reshape(len(tokens), -1)
+        duration = outputs[self._output_names.index("duration")].reshape(
+            len(tokens), -1
+        )
+        audio = [
+            waveform[i, : int(duration[i, : len(t) + 2].sum()) * SAMPLES_PER_FRAME]
+            for i, t in enumerate(tokens)
+        ]
+        log.debug(
+            f"Created audio for batch of {len(tokens)} in {time.time() - start_t:.2f}s"
+        )
+        return audio
+
+    def get_voice_style(self, name: str) -> NDArray[np.float32]:
+        return self.voices[name]
+
+    def _split_phonemes(
+        self,
+        phonemes: str,
+        chunker: Chunker | None = None,
+        emitted: int = 0,
+        final: bool = True,
+    ) -> list[str]:
+        """
+        Split phonemes into chunks of at most MAX_PHONEME_LENGTH tokens with chunker (self.chunker by default).
+        emitted is the number of chunks already created from earlier text when splitting incrementally,
+        final is False while more phonemes may follow.
+        """
+        chunker = chunker or self.chunker
+        # Count tokens rather than characters the vocab doesn't know
+        phonemes = self.tokenizer.filter_phonemes(phonemes)
+        if final:
+            return chunker.split(phonemes, emitted)
+        return chunker.split_incremental(phonemes, emitted)
+
+    @staticmethod
+    def _split_sentences(text: str) -> list[str]:
+        """
+        Split text into sentences and lines so they can be phonemized one at a time
+        """
+        return [s for s in re.split(r"(?<=[.!?;])\s+|\n+", text) if s.strip()]
+
+    def _iter_batches(
+        self, segments: Iterable[str], chunker: Chunker | None = None
+    ) -> Iterator[str]:
+        """
+        Split phonemes arriving segment by segment into batches without waiting for the whole text.
+        Every batch but the last one of the text seen so far is final, the last one waits for more phonemes.
+        """
+        pending = ""
+        emitted = 0
+        for segment in segments:
+            pending = f"{pending} {segment}".strip()
+            batched_phonemes = self._split_phonemes(
+                pending, chunker, emitted, final=False
+            )
+            yield from batched_phonemes[:-1]
+            emitted += max(len(batched_phonemes) - 1, 0)
+            pending = batched_phonemes[-1] if batched_phonemes else ""
+        yield from self._split_phonemes(pending, chunker, emitted)
+
+    @staticmethod
+    def _split_text_buffer(
+        buffer: str, clause_chars: int = 100, max_chars: int = 300
+    ) -> tuple[list[str], str]:
+        """
+        Take the complete segments out of streamed text, returns them and the incomplete rest.
+        Segments end at sentence boundaries, at clause boundaries once clause_chars are buffered,
+        or at a space once max_chars are buffered.
+        """
+        # The boundary must be followed by whitespace, so "3." of "3.5" isn't cut early
+        boundaries = [m.end() for m in re.finditer(r"[.!?;](?=\s)|\n", buffer)]
+        if not boundaries and len(buffer) >= clause_chars:
+            boundaries = [m.end() for m in re.finditer(r"[,:](?=\s)", buffer)]
+        if not boundaries and len(buffer) >= max_chars:
+            boundaries = [m.start() for m in re.finditer(r"\s", buffer)]
+        if not boundaries:
+            return [], buffer
+        end = boundaries[-1]
+        return Kokoro._split_sentences(buffer[:end]), buffer[end:]
+
+    async def _iter_text_stream(
+        self,
+        text_stream: AsyncIterable[str],
+        lang: str,
+        is_phonemes: bool,
+        chunker: Chunker | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Buffer text pieces until a segment is complete, then phonemize it and yield its batches right away
+        """
+        buffer = ""
+        emitted = 0
+        loop = asyncio.get_running_loop()
+
+        async def batches_of(segments: list[str]) -> AsyncIterator[str]:
+            nonlocal emitted
+            for segment in segments:
+                # espeak blocks (and may wait for the phonemize lock), keep it off the event loop
+                phonemes = (
+                    segment
+                    if is_phonemes
+                    else await loop.run_in_executor(
+                        None, self.tokenizer.phonemize, segment, lang
+                    )
+                )
+                for batch in self._split_phonemes(phonemes, chunker, emitted):
+                    emitted += 1
+                    yield batch
+
+        async for piece in text_stream:
+            buffer += piece
+            segments, buffer = self._split_text_buffer(buffer)
+            async for batch in batches_of(segments):
+                yield batch
+        async for batch in batches_of([buffer] if buffer.strip() else []):
+            yield batch
+
+    def _create_pipelined(
+        self,
+        batched_phonemes: Iterator[str],
+        voice: NDArray[np.float32],
+        speed: float,
+        trim: bool,
+        assembler: AudioAssembler,
+    ):
+        """
+        Overlap the stages of each chunk: while chunk k runs in the session (or the scheduler),
+        chunk k+1 is taken from batched_phonemes and prepared and chunk k-1 is trimmed on worker threads.
+        batched_phonemes is consumed on the worker, so text it phonemizes lazily is phonemized while the model runs.
+        Chunks are appended to assembler in order as soon as they're done.
+        """
+
+        def prepare() -> tuple[str, tuple[dict[str, NDArray], int, int] | None] | None:
+            phonemes = next(batched_phonemes, None)
+            if phonemes is None:
+                return None
+            # The scheduler tokenizes on its own worker
+            if self.scheduler is not None:
+                return phonemes, None
+            return phonemes, self._prepare_inputs(phonemes, voice, speed)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            trimmed: Future[tuple[NDArray[np.float32], NDArray]] | None = None
+            # Only one prepare is in flight at a time, so the iterator isn't advanced concurrently
+            prepared = executor.submit(prepare)
+            while (chunk := prepared.result()) is not None:
+                prepared = executor.submit(prepare)
+                phonemes, inputs = chunk
+                if inputs is None:
+                    audio_part = self.scheduler.submit(phonemes, voice, speed).result()
+                else:
+                    audio_part = self._run(*inputs)
+                if not trim:
+                    assembler.append(audio_part)
+                    continue
+                if trimmed is not None:
+                    assembler.append(trimmed.result()[0])
+                trimmed = executor.submit(trim_audio, audio_part)
+            if trimmed is not None:
+                assembler.append(trimmed.result()[0])
+
+    def create(
+        self,
+        text: str,
+        voice: str | NDArray[np.float32],
+        speed: float = 1.0,
+        lang: str = "en-us",
+        is_phonemes: bool = False,
+        trim: bool = True,
+        pipeline: bool = False,
+        crossfade: float = 0.01,
+        sample_rate: int = SAMPLE_RATE,
+    ) -> tuple[NDArray[np.float32], int]:
+        """
+        Create audio from text using the specified voice and speed.
+        With pipeline=True the text is phonemized sentence by sentence, the next chunk phonemized and tokenized
+        and the previous one trimmed on worker threads while the model runs, which speeds up long texts
+        on multi-core machines and starts the model after the first sentence rather than the whole text.
+        Chunks are written into one preallocated buffer and joined with an equal-power crossfade
+        of crossfade seconds (0 for hard cuts).
+        sample_rate resamples the audio from SAMPLE_RATE, e.g. 8000 for telephony or 48000 for WebRTC.
+        """
+        assert speed >= 0.5 and speed <= 2.0, "Speed should be between 0.5 and 2.0"
+        assert sample_rate > 0, "Sample rate should be positive"
+
+        if isinstance(voice, str):
+            assert voice in self.voices, f"Voice {voice} not found in available voices"
+            voice = self.get_voice_style(voice)
+
+        start_t = time.time()
+        if pipeline:
+            if is_phonemes:
+                segments = [text]
+            else:
+                segments = (
+                    self.tokenizer.phonemize(sentence, lang)
+                    for sentence in self._split_sentences(text)
+                )
+            # The phonemes aren't known up front, the text length is close to the token count
+            # and the assembler grows if it's exceeded
+            assembler = AudioAssembler.for_tokens(len(text), speed, crossfade)
+            self._create_pipelined(
+                self._iter_batches(segments), voice, speed, trim, assembler
+            )
+        else:
+            if is_phonemes:
+                phonemes = text
+            else:
+                phonemes = self.tokenizer.phonemize(text, lang)
+            # Create batches of phonemes by splitting spaces to MAX_PHONEME_LENGTH
+            batched_phoenemes = self._split_phonemes(phonemes)
+
+            log.debug(
+                f"Creating audio for {len(batched_phoenemes)} batches for {len(phonemes)} phonemes"
+            )
+            # Chunks are filtered against the vocab, so their lengths are token counts
+            assembler = AudioAssembler.for_tokens(
+                sum(map(len, batched_phoenemes)), speed, crossfade
+            )
+            for phonemes in batched_phoenemes:
+                audio_part, _ = self._create_audio(phonemes, voice, speed)
+                if trim:
+                    # Trim leading and trailing silence for a more natural sound concatenation
+                    # (initial ~2s, subsequent ~0.02s)
+                    audio_part, _ = trim_audio(audio_part)
+                assembler.append(audio_part)
+        audio = assembler.result()
+        if sample_rate != SAMPLE_RATE:
+            audio = resample(audio, sample_rate)
+        log.debug(f"Created audio in {time.time() - start_t:.2f}s")
+        return audio, sample_rate
+
+    def create_batch(
+        self,
+        texts: list[str],
+        voices: str | NDArray[np.float32] | list[str | NDArray[np.float32]],
+        speeds: float | list[float] = 1.0,
+        lang: str = "en-us",
+        is_phonemes: bool = False,
+        trim: bool = True,
+        batch_size: int = 16,
+        crossfade: float = 0.01,
+    ) -> list[tuple[NDArray[np.float32], int]]:
+        """
+        Create audio for many texts at once.
+        Models exported with a dynamic batch axis run up to batch_size chunks per session call,
+        other models fall back to running the chunks one by one.
+        Chunks of a text are joined like create does, with a crossfade of crossfade seconds.
+        """
+        if not isinstance(voices, list):
+            voices = [voices] * len(texts)
+        if not isinstance(speeds, list):
+            speeds = [speeds] * len(texts)
+        assert len(voices) == len(texts) and len(speeds) == len(texts), (
+            "voices and speeds should match the number of texts"
+        )
+
+        start_t = time.time()
+        # Flatten every text into (item index, phonemes, voice, speed) chunks
+        chunks: list[tuple[int, str, NDArray[np.float32], float]] = []
+        if not is_phonemes:
+            # One espeak call for all texts instead of one per text
+            texts = self.tokenizer.phonemize_batch(texts, lang)
+        for i, (phonemes, voice, speed) in enumerate(zip(texts, voices, speeds)):
+            assert speed >= 0.5 and speed <= 2.0, "Speed should be between 0.5 and 2.0"
+            if isinstance(voice, str):
+                assert voice in self.voices, (
+                    f"Voice {voice} not found in available voices"
+                )
+                voice = self.get_voice_style(voice)
+            for part in self._split_phonemes(phonemes):
+                chunks.append((i, part, voice, speed))
+
+        # Sort by length so each batch needs as little padding as possible
+        order = sorted(range(len(chunks)), key=lambda c: len(chunks[c][1]))
+        audio_parts: list[NDArray[np.float32] | None] = [None] * len(chunks)
+        if self._supports_batch():
+            for start in range(0, len(order), batch_size):
+                indices = order[start : start + batch_size]
+                results = self._create_audio_batch(
+                    [chunks[c][1] for c in indices],
+                    [chunks[c][2] for c in indices],
+                    [chunks[c][3] for c in indices],
+                )
+                for c, audio_part in zip(indices, results):
+                    audio_parts[c] = audio_part
+        else:
+            for c in order:
+                _, phonemes, voice, speed = chunks[c]
+                audio_parts[c], _ = self._create_audio(phonemes, voice, speed)
+
+        tokens = [0] * len(texts)
+        for i, phonemes, *_ in chunks:
+            tokens[i] += len(phonemes)
+        assemblers = [
+            AudioAssembler.for_tokens(count, speed, crossfade)
+            for count, speed in zip(tokens, speeds)
+        ]
+        for c, (i, *_) in enumerate(chunks):
+            audio_part = audio_parts[c]
+            # Drop the reference as soon as the chunk is in its timeline
+            audio_parts[c] = None
+            if trim:
+                audio_part, _ = trim_audio(audio_part)
+            assemblers[i].append(audio_part)
+        log.debug(
+            f"Created audio for {len(texts)} texts ({len(chunks)} chunks) in {time.time() - start_t:.2f}s"
+        )
+        return [(assembler.result(), SAMPLE_RATE) for assembler in assemblers]
+
+    async def create_stream(
+        self,
+        text: str | AsyncIterable[str],
+        voice: str | NDArray[np.float32],
+        speed: float = 1.0,
+        lang: str = "en-us",
+        is_phonemes: bool = False,
+        trim: bool = True,
+        max_buffered_chunks: int = 0,
+        first_chunk_phonemes: int | None = None,
+        chunk_growth: float = 2.0,
+        sample_rate: int = SAMPLE_RATE,
+    ) -> AsyncGenerator[tuple[NDArray[np.float32], int], None]:
+        """
+        Stream audio creation asynchronously in the background, yielding chunks as they are processed.
+        max_buffered_chunks limits how many chunks are created ahead of the consumer (0 means unbounded).
+        Closing the stream cancels the background processing.
+        first_chunk_phonemes makes the first chunk end at the first clause boundary (e.g. 50) for a
+        lower time to first audio, following chunks grow by chunk_growth up to MAX_PHONEME_LENGTH
+        (Chunker.latency), otherwise chunks are split with the instance's chunker.
+        text can also be an async iterable of text pieces (e.g. LLM tokens), each sentence is created
+        as soon as it's complete while more text is still arriving.
+        sample_rate resamples the chunks from SAMPLE_RATE, with the filter state carried from chunk to chunk
+        so the joined stream is the same as resampling the whole audio.
+        """
+        assert speed >= 0.5 and speed <= 2.0, "Speed should be between 0.5 and 2.0"
+        assert sample_rate > 0, "Sample rate should be positive"
+
+        if isinstance(voice, str):
+            assert voice in self.voices, f"Voice {voice} not found in available voices"
+            voice = self.get_voice_style(voice)
+
+        chunker = None
+        if first_chunk_phonemes:
+            chunker = Chunker.latency(first_chunk_phonemes, chunk_growth)
+        if not isinstance(text, str):
+            batched_phonemes = self._iter_text_stream(text, lang, is_phonemes, chunker)
+        else:
+            if is_phonemes:
+                segments = [text]
+            else:
+                # Phonemize sentence by sentence as the stream needs them,
+                # so the first chunk doesn't wait for the whole text
+                segments = (
+                    self.tokenizer.phonemize(sentence, lang)
+                    for sentence in self._split_sentences(text)
+                )
+            batched_phonemes = _iter_in_executor(self._iter_batches(segments, chunker))
+        # The next segment is phonemized while the current chunk is created
+        batched_phonemes = _prefetch(batched_phonemes)
+        queue: asyncio.Queue[tuple[NDArray[np.float32], int] | Exception | None] = (
+            asyncio.Queue(maxsize=max_buffered_chunks)
+        )
+        resampler = Resampler(sample_rate) if sample_rate != SAMPLE_RATE else None
+
+        async def process_batches():
+            """Process phoneme batches in the background."""
+            try:
+                i = 0
+                async for phonemes in batched_phonemes:
+                    loop = asyncio.get_event_loop()
+                    # Execute in separate thread since it's blocking operation
+                    audio_part, _ = await loop.run_in_executor(
+                        None, self._create_audio, phonemes, voice, speed
+                    )
+                    if trim:
+                        # Trim leading and trailing silence for a more natural sound concatenation
+                        # (initial ~2s, subsequent ~0.02s)
+                        audio_part, _ = trim_audio(audio_part)
+                    if resampler is not None:
+                        audio_part = resampler.process(audio_part)
+                    log.debug(f"Processed chunk {i} of stream")
+                    i += 1
+                    # Waits here while the queue is full
+                    await queue.put((audio_part, sample_rate))
+                if resampler is not None:
+                    # The filter's delay holds back the end of the last chunk
+                    await queue.put((resampler.flush(), sample_rate))
+            except Exception as e:
+                # Hand the error to the consumer instead of leaving it waiting forever
+                await queue.put(e)
+                return
+            await queue.put(None)  # Signal the end of the stream
+
+        # Start processing in the background
+        task = asyncio.create_task(process_batches())
+
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            # The consumer stopped early (e.g. client disconnected), stop creating audio.
+            # The result of a chunk already running in the executor is discarded.
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    def get_voices(self) -> list[str]:
+        return list(sorted(self.voices.keys()))
@@ -0,0 +1,76 @@
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import onnxruntime as rt
+
+from .log import log
+
+
+@dataclass
+class SessionPoolStats:
+    size: int
+    in_use: int
+    checkouts: int
+    total_wait: float
+    max_wait: float
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.checkouts if self.checkouts else 0.0
+
+
+class SessionPool:
+    """
+    Fixed set of inference sessions that callers check out one at a time.
+    When every session is busy callers queue until one is returned.
+    """
+
+    def __init__(self, sessions: list[rt.InferenceSession]):
+        assert sessions, "Session pool needs at least one session"
+        self.sessions = sessions
+        self._idle: queue.Queue[rt.InferenceSession] = queue.Queue()
+        for session in sessions:
+            self._idle.put(session)
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @staticmethod
+    def threads_per_session(pool_size: int) -> int:
+        """
+        Split the CPU cores between the sessions of the pool so concurrent runs don't oversubscribe them
+        See https://onnxruntime.ai/docs/performance/tune-performance/threading.html
+        """
+        return max(1, (os.cpu_count() or 1) // pool_size)
+
+    @contextmanager
+    def session(self) -> Iterator[rt.InferenceSession]:
+        start_t = time.perf_counter()
+        session = self._idle.get()
+        wait = time.perf_counter() - start_t
+        with self._lock:
+            self._checkouts += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+        if wait > 0.1:
+            log.debug(f"Waited {wait:.2f}s for an idle session")
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+
+    def stats(self) -> SessionPoolStats:
+        with self._lock:
+            return SessionPoolStats(
+                size=len(self.sessions),
+                in_use=len(self.sessions) - self._idle.qsize(),
+                checkouts=self._checkouts,
+                total_wait=self._total_wait,
+                max_wait=self._max_wait,
+            )
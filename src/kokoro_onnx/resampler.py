@@ -0,0 +1,162 @@
+"""
+Polyphase resampling from the model's SAMPLE_RATE to other rates, e.g. 8 kHz telephony or 48 kHz WebRTC.
+
+The anti-aliasing filter for a rate ratio up/down is a Kaiser windowed sinc, split into up phases once
+and cached, and each output sample is one dot product of a phase with the input around it.
+Resampler keeps the input the next samples need between process calls, so a stream resampled chunk by chunk
+is identical to resampling the whole audio at once, without clicks at chunk boundaries.
+"""
+
+import functools
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from numpy.typing import NDArray
+
+from .config import SAMPLE_RATE
+
+# Zero crossings of the sinc on each side of the center, more is a steeper cutoff but slower
+FILTER_HALF_WIDTH = 16
+# Kaiser window beta, about 80 dB of stopband attenuation
+FILTER_BETA = 8.0
+
+
+# Bounded, odd rate pairs build large banks
+@functools.lru_cache(maxsize=16)
+def _filter_bank(
+    up: int, down: int, half_width: int, beta: float
+) -> NDArray[np.float32]:
+    """
+    Filter phases of shape (up, taps), each phase reversed so it's applied with a dot product
+    """
+    max_rate = max(up, down)
+    half_length = half_width * max_rate
+    n = np.arange(-half_length, half_length + 1)
+    # Cut off at the lower of the two Nyquist frequencies, in the upsampled rate
+    h = np.sinc(n / max_rate) * np.kaiser(len(n), beta)
+    # Unity gain at DC for each phase on average, zero stuffing divides it by up
+    h *= up / h.sum()
+    taps = -(-len(h) // up)
+    h = np.pad(h, (0, taps * up - len(h)))
+    return np.ascontiguousarray(h.reshape(taps, up).T[:, ::-1], dtype=np.float32)
+
+
+class Resampler:
+    """
+    Resample a stream of chunks from source_rate to target_rate.
+    Output lags the input by about half the filter length, flush returns the rest at the end of the stream.
+    """
+
+    def __init__(
+        self,
+        target_rate: int,
+        source_rate: int = SAMPLE_RATE,
+        half_width: int = FILTER_HALF_WIDTH,
+        beta: float = FILTER_BETA,
+    ):
+        assert target_rate > 0 and source_rate > 0, "Sample rates should be positive"
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        divisor = math.gcd(source_rate, target_rate)
+        self.up = target_rate // divisor
+        self.down = source_rate // divisor
+        self._bank = _filter_bank(self.up, self.down, half_width, beta)
+        self._taps = self._bank.shape[1]
+        # Filter center in the upsampled rate
+        self._center = half_width * max(self.up, self.down)
+        self.reset()
+
+    def reset(self):
+        # Input before the start of the stream is silence
+        self._buffer = np.zeros(self._taps - 1, dtype=np.float32)
+        # Input index of the first buffered sample, and totals so far
+        self._start = 1 - self._taps
+        self._received = 0
+        self._emitted = 0
+
+    def _last_input(self, output: int) -> int:
+        """
+        Index of the last input sample that output sample depends on
+        """
+        return (output * self.down + self._center) // self.up
+
+    def _emit(self, end: int) -> NDArray[np.float32]:
+        """
+        Output samples up to end, the buffer must hold their input
+        """
+        begin = self._emitted
+        if end <= begin:
+            return np.zeros(0, dtype=np.float32)
+        out = np.empty(end - begin, dtype=np.float32)
+        # Every up-th output sample uses the same phase, with its window down samples further
+        for i in range(min(self.up, len(out))):
+            output = begin + i
+            phase = (output * self.down + self._center) % self.up
+            first = self._last_input(output) - self._taps + 1 - self._start
+            count = len(range(i, len(out), self.up))
+            out[i :: self.up] = self._apply_phase(self._bank[phase], first, count)
+        self._emitted = end
+        # Drop the input no later output sample needs
+        drop = self._last_input(self._emitted) - self._taps + 1 - self._start
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._start += drop
+        return out
+
+    def _apply_phase(
+        self, taps: NDArray[np.float32], first: int, count: int
+    ) -> NDArray[np.float32]:
+        """
+        count dot products of taps with buffer windows starting at first, down samples apart
+        """
+        if self.up == 1 or self.down == 1:
+            # Integer ratios, split the strided windows into down plain correlations, which are faster
+            result = None
+            for offset in range(min(self.down, len(taps))):
+                part = taps[offset :: self.down]
+                inputs = self._buffer[first + offset :: self.down][
+                    : count + len(part) - 1
+                ]
+                correlation = np.correlate(inputs, part)
+                result = correlation if result is None else result + correlation
+            return result
+        windows = sliding_window_view(self._buffer, len(taps))
+        return windows[first : first + (count - 1) * self.down + 1 : self.down] @ taps
+
+    def process(self, samples: NDArray[np.float32]) -> NDArray[np.float32]:
+        if self.up == self.down:
+            return samples
+        self._buffer = np.concatenate([self._buffer, samples.astype(np.float32)])
+        self._received += len(samples)
+        # Output samples whose input has all arrived
+        end = (self._received * self.up - 1 - self._center) // self.down + 1
+        return self._emit(end)
+
+    def flush(self) -> NDArray[np.float32]:
+        """
+        The remaining output at the end of the stream, the resampler is reset for the next stream
+        """
+        if self.up == self.down:
+            return np.zeros(0, dtype=np.float32)
+        end = -(-self._received * self.up // self.down)
+        # Input after the end of the stream is silence
+        padding = self._last_input(end) + 1 - self._start - len(self._buffer)
+        self._buffer = np.concatenate(
+            [self._buffer, np.zeros(max(padding, 0), dtype=np.float32)]
+        )
+        out = self._emit(end)
+        self.reset()
+        return out
+
+
+def resample(
+    audio: NDArray[np.float32], target_rate: int, source_rate: int = SAMPLE_RATE
+) -> NDArray[np.float32]:
+    """
+    Resample a whole audio at once
+    """
+    resampler = Resampler(target_rate, source_rate)
+    if resampler.up == resampler.down:
+        return audio
+    return np.concatenate([resampler.process(audio), resampler.flush()])
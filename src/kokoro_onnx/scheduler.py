@@ -0,0 +1,226 @@
+"""
+Micro-batching of chunks from concurrent create and create_stream calls, for Kokoro(scheduler=...).
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .config import MAX_PHONEME_LENGTH
+from .log import log
+
+if TYPE_CHECKING:
+    import onnxruntime as rt
+
+    from .kokoro import Kokoro
+
+
+@dataclass
+class SchedulerStats:
+    items: int
+    batches: int
+    total_queue_wait: float
+    max_queue_wait: float
+    run_time: float
+    elapsed: float
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+    @property
+    def avg_queue_wait(self) -> float:
+        return self.total_queue_wait / self.items if self.items else 0.0
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.elapsed if self.elapsed else 0.0
+
+
+@dataclass
+class _Item:
+    phonemes: str
+    voice: NDArray[np.float32]
+    speed: float
+    submitted: float = field(default_factory=time.perf_counter)
+    future: Future = field(default_factory=Future)
+
+
+class BatchScheduler:
+    """
+    Collect the chunks that concurrent callers submit for up to window seconds (or max_batch_size chunks),
+    group the ones whose token lengths differ by at most max_padding and run each group at once.
+    Models exported with a dynamic batch axis run a group as one batched session call,
+    other models run it back to back on one session, so the group doesn't queue for the pool per chunk.
+
+    There's a worker per session of the pool, they take turns collecting so a window isn't split between them.
+    While every worker is busy chunks keep queueing, so batches grow with the load.
+    Batched runs don't go through the audio cache.
+    """
+
+    def __init__(
+        self, window: float = 0.01, max_batch_size: int = 16, max_padding: int = 64
+    ):
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.max_padding = max_padding
+        self._queue: queue.Queue[_Item | None] = queue.Queue()
+        self._collect_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._workers: list[threading.Thread] = []
+        self._items = 0
+        self._batches = 0
+        self._total_queue_wait = 0.0
+        self._max_queue_wait = 0.0
+        self._run_time = 0.0
+        self._started = time.perf_counter()
+
+    def start(self, kokoro: "Kokoro"):
+        """
+        Start the workers for that Kokoro instance, Kokoro(scheduler=...) calls this
+        """
+        assert not self._workers, "Scheduler is already started"
+        self._kokoro = kokoro
+        self._started = time.perf_counter()
+        for i in range(len(kokoro.pool.sessions)):
+            worker = threading.Thread(
+                target=self._work, name=f"kokoro-scheduler-{i}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def close(self):
+        """
+        Stop the workers after the chunks already submitted
+        """
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    def submit(self, phonemes: str, voice: NDArray[np.float32], speed: float) -> Future:
+        """
+        Queue a chunk, the future resolves to its audio
+        """
+        item = _Item(phonemes, voice, speed)
+        self._queue.put(item)
+        return item.future
+
+    def stats(self) -> SchedulerStats:
+        with self._stats_lock:
+            return SchedulerStats(
+                items=self._items,
+                batches=self._batches,
+                total_queue_wait=self._total_queue_wait,
+                max_queue_wait=self._max_queue_wait,
+                run_time=self._run_time,
+                elapsed=time.perf_counter() - self._started,
+            )
+
+    def _collect(self) -> list[_Item | None]:
+        with self._collect_lock:
+            items = [self._queue.get()]
+            if items[0] is None:
+                return items
+            # The window starts when the first chunk was submitted, it may have waited for a worker already
+            deadline = items[0].submitted + self.window
+            while len(items) < self.max_batch_size:
+                try:
+                    timeout = deadline - time.perf_counter()
+                    item = (
+                        self._queue.get(timeout=timeout)
+                        if timeout > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                items.append(item)
+                if item is None:
+                    break
+            return items
+
+    def _group(self, items: list[_Item]) -> list[list[_Item]]:
+        """
+        Groups of similar token lengths, shortest first
+        """
+        groups: list[list[_Item]] = []
+        for item in sorted(items, key=lambda item: len(item.phonemes)):
+            if (
+                groups
+                and len(item.phonemes) - len(groups[-1][0].phonemes) <= self.max_padding
+            ):
+                groups[-1].append(item)
+            else:
+                groups.append([item])
+        return groups
+
+    def _run_item(self, item: _Item, sess: "rt.InferenceSession"):
+        """
+        Run a single chunk, a failure only fails that chunk's future
+        """
+        kokoro = self._kokoro
+        try:
+            inputs = kokoro._prepare_inputs(item.phonemes, item.voice, item.speed)
+            item.future.set_result(kokoro._run(*inputs, sess=sess))
+        except Exception as e:
+            item.future.set_exception(e)
+
+    def _run_group(self, group: list[_Item]):
+        kokoro = self._kokoro
+        start_t = time.perf_counter()
+        results = None
+        if kokoro._supports_batch() and len(group) > 1:
+            try:
+                results = kokoro._create_audio_batch(
+                    [item.phonemes for item in group],
+                    [item.voice for item in group],
+                    [item.speed for item in group],
+                )
+            except Exception as e:
+                # Find out which chunk failed instead of failing all of them
+                log.warning(
+                    f"Batch of {len(group)} chunks failed ({e}), running them one by one"
+                )
+        if results is not None:
+            for item, audio in zip(group, results):
+                item.future.set_result(audio)
+        else:
+            with kokoro.pool.session() as sess:
+                for item in group:
+                    self._run_item(item, sess)
+        run_time = time.perf_counter() - start_t
+        queue_wait = [start_t - item.submitted for item in group]
+        with self._stats_lock:
+            self._items += len(group)
+            self._batches += 1
+            self._total_queue_wait += sum(queue_wait)
+            self._max_queue_wait = max(self._max_queue_wait, *queue_wait)
+            self._run_time += run_time
+        log.debug(
+            "Ran group of %d chunks (up to %d phonemes) in %.3fs, waited up to %.3fs",
+            len(group),
+            min(len(group[-1].phonemes), MAX_PHONEME_LENGTH),
+            run_time,
+            max(queue_wait),
+        )
+
+    def _work(self):
+        while True:
+            items = self._collect()
+            stop = items[-1] is None
+            for group in self._group([item for item in items if item is not None]):
+                try:
+                    self._run_group(group)
+                except Exception as e:
+                    for item in group:
+                        if not item.future.done():
+                            item.future.set_exception(e)
+            if stop:
+                return
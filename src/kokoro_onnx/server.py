@@ -0,0 +1,506 @@
+"""
+HTTP speech server compatible with the OpenAI speech API, on asyncio and the standard library.
+
+kokoro-onnx-server --model kokoro-v1.0.onnx --voices voices-v1.0.bin
+curl http://127.0.0.1:8880/v1/audio/speech -H "Content-Type: application/json" \\
+    -d '{"model": "kokoro", "input": "Hello world", "voice": "af_sarah", "response_format": "wav"}' -o audio.wav
+
+POST /v1/audio/speech  audio streamed with chunked transfer encoding as Kokoro.create_stream creates it.
+    response_format is one of kokoro_onnx.encoders.ENCODERS (pcm, wav, mulaw, alaw, opus),
+    extra fields lang (default en-us) and sample_rate (default 24000, one of SAMPLE_RATES).
+GET /v1/audio/voices   available voices
+GET /health            the process is up
+GET /ready             the sessions are warmed up and requests get steady latency
+GET /metrics           request, session pool and batching counters
+
+One Kokoro instance, with its sessions and voice store, is shared by all requests.
+At most max_concurrency requests create audio at once, up to max_queue more wait for their turn
+and the rest get 503 right away, so a burst can't pile up unbounded latency.
+With --batch_window the chunks of concurrent requests are batched by a BatchScheduler.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import json
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+
+from .config import SAMPLE_RATE
+from .encoders import ENCODERS, encode_stream, get_encoder
+from .kokoro import Kokoro
+from .log import log
+from .scheduler import BatchScheduler
+
+# OpenAI's limit on the input length
+MAX_INPUT_LENGTH = 4096
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 1024 * 1024
+# Seconds an idle keep-alive connection stays open
+KEEP_ALIVE_TIMEOUT = 30
+# Output rates a request can ask for, arbitrary ones would build large resampling filters
+SAMPLE_RATES = (8000, 16000, 22050, 24000, 44100, 48000)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str, param: str | None = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.param = param
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    headers: dict[str, str]
+    body: bytes
+    keep_alive: bool
+
+
+class SpeechServer:
+    """
+    first_chunk_phonemes: end the first chunk early for a lower time to first byte (Chunker.latency), 0 to disable.
+    default_format: response_format when the request has none, OpenAI's default mp3 isn't supported.
+    """
+
+    def __init__(
+        self,
+        kokoro: Kokoro,
+        max_concurrency: int = 1,
+        max_queue: int = 16,
+        default_format: str = "wav",
+        first_chunk_phonemes: int = 50,
+        max_input_length: int = MAX_INPUT_LENGTH,
+    ):
+        self.kokoro = kokoro
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.default_format = default_format
+        self.first_chunk_phonemes = first_chunk_phonemes
+        self.max_input_length = max_input_length
+        self.ready = False
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._active = 0
+        self._waiting = 0
+        self._requests = 0
+        self._rejected = 0
+
+    async def warmup(self, langs: list[str] | None = None):
+        loop = asyncio.get_running_loop()
+        start_t = time.time()
+        try:
+            await loop.run_in_executor(None, lambda: self.kokoro.warmup(langs=langs))
+        except Exception:
+            log.exception("Warmup failed, the server stays not ready")
+            return
+        self.ready = True
+        log.info(f"Ready after warming up for {time.time() - start_t:.2f}s")
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        return await asyncio.start_server(
+            self._handle_connection, host, port, limit=MAX_HEADER_SIZE
+        )
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Request | None:
+        try:
+            head = await asyncio.wait_for(
+                reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT
+            )
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+            # Client closed the connection or went idle
+            return None
+        except asyncio.LimitOverrunError as e:
+            raise HTTPError(
+                HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Headers too large"
+            ) from e
+
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = request_line.split(" ")
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line") from e
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(
+                HTTPStatus.LENGTH_REQUIRED, "Chunked request bodies are not supported"
+            )
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from e
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body too large")
+        body = await reader.readexactly(length) if length else b""
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = (
+            connection != "close"
+            if version == "HTTP/1.1"
+            else connection == "keep-alive"
+        )
+        return Request(method, target.split("?")[0], headers, body, keep_alive)
+
+    @staticmethod
+    async def _send(
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        headers: dict[str, str],
+        body: bytes | None = None,
+    ):
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if body:
+            writer.write(body)
+        await writer.drain()
+
+    async def _send_json(
+        self,
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        payload: dict,
+        keep_alive: bool,
+        headers: dict[str, str] | None = None,
+    ):
+        await self._send(
+            writer,
+            status,
+            {
+                "Content-Type": "application/json",
+                "Connection": "keep-alive" if keep_alive else "close",
+                **(headers or {}),
+            },
+            json.dumps(payload).encode(),
+        )
+
+    async def _send_error(
+        self, writer: asyncio.StreamWriter, error: HTTPError, keep_alive: bool
+    ):
+        # Same error body as the OpenAI API
+        payload = {
+            "error": {
+                "message": error.message,
+                "type": "invalid_request_error"
+                if error.status < 500
+                else "server_error",
+                "param": error.param,
+                "code": None,
+            }
+        }
+        headers = (
+            {"Retry-After": "1"}
+            if error.status == HTTPStatus.SERVICE_UNAVAILABLE
+            else None
+        )
+        await self._send_json(writer, error.status, payload, keep_alive, headers)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._send_error(writer, e, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                try:
+                    await self._dispatch(request, writer)
+                except HTTPError as e:
+                    await self._send_error(writer, e, request.keep_alive)
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            log.debug("Client disconnected")
+        except Exception:
+            # Headers may be out already, all that's left is closing the connection
+            log.exception("Failed to handle request")
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter):
+        routes = {
+            ("POST", "/v1/audio/speech"): self._speech,
+            ("GET", "/v1/audio/voices"): self._voices,
+            ("GET", "/health"): self._health,
+            ("GET", "/ready"): self._ready,
+            ("GET", "/metrics"): self._metrics,
+        }
+        handler = routes.get((request.method, request.path))
+        if handler is None:
+            if any(path == request.path for _, path in routes):
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Method not allowed")
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No route for {request.path}")
+        await handler(request, writer)
+
+    async def _health(self, request: Request, writer: asyncio.StreamWriter):
+        await self._send_json(
+            writer, HTTPStatus.OK, {"status": "ok"}, request.keep_alive
+        )
+
+    async def _ready(self, request: Request, writer: asyncio.StreamWriter):
+        if not self.ready:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Warming up")
+        await self._send_json(
+            writer,
+            HTTPStatus.OK,
+            {
+                "status": "ready",
+                "active": self._active,
+                "waiting": self._waiting,
+            },
+            request.keep_alive,
+        )
+
+    async def _metrics(self, request: Request, writer: asyncio.StreamWriter):
+        metrics = {
+            "requests": self._requests,
+            "rejected": self._rejected,
+            "active": self._active,
+            "waiting": self._waiting,
+            "pool": dataclasses.asdict(self.kokoro.pool.stats()),
+        }
+        if self.kokoro.scheduler is not None:
+            stats = self.kokoro.scheduler.stats()
+            metrics["scheduler"] = {
+                **dataclasses.asdict(stats),
+                "avg_batch_size": stats.avg_batch_size,
+                "avg_queue_wait": stats.avg_queue_wait,
+                "items_per_second": stats.items_per_second,
+            }
+        await self._send_json(writer, HTTPStatus.OK, metrics, request.keep_alive)
+
+    async def _voices(self, request: Request, writer: asyncio.StreamWriter):
+        await self._send_json(
+            writer,
+            HTTPStatus.OK,
+            {"voices": self.kokoro.get_voices()},
+            request.keep_alive,
+        )
+
+    def _parse_speech(self, request: Request) -> tuple[dict, str]:
+        try:
+            payload = json.loads(request.body)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid JSON body: {e}") from e
+        if not isinstance(payload, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body should be a JSON object")
+
+        text = payload.get("input")
+        if not isinstance(text, str) or not text.strip():
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "input is required", "input")
+        if len(text) > self.max_input_length:
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST,
+                f"input is longer than {self.max_input_length} characters",
+                "input",
+            )
+        voice = payload.get("voice")
+        if not isinstance(voice, str) or voice not in self.kokoro.voices:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Voice {voice} not found", "voice")
+        try:
+            speed = float(payload.get("speed", 1.0))
+        except (TypeError, ValueError) as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid speed", "speed") from e
+        if not 0.5 <= speed <= 2.0:
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST, "speed should be between 0.5 and 2.0", "speed"
+            )
+        if payload.get("stream_format", "audio") != "audio":
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST,
+                "Only stream_format audio is supported",
+                "stream_format",
+            )
+        response_format = payload.get("response_format") or self.default_format
+        if response_format not in ENCODERS:
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST,
+                f"Unsupported response_format {response_format}, supported: {', '.join(ENCODERS)}",
+                "response_format",
+            )
+        sample_rate = payload.get("sample_rate", SAMPLE_RATE)
+        if sample_rate not in SAMPLE_RATES:
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST,
+                f"Unsupported sample_rate {sample_rate}, supported: {', '.join(map(str, SAMPLE_RATES))}",
+                "sample_rate",
+            )
+        lang = payload.get("lang", "en-us")
+        if not isinstance(lang, str):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid lang", "lang")
+        options = {
+            "text": text,
+            "voice": voice,
+            "speed": speed,
+            "lang": lang,
+            "sample_rate": int(sample_rate),
+        }
+        return options, response_format
+
+    def _check_lang(self, lang: str):
+        """
+        Load the espeak backend of lang, so an unsupported one fails before the response starts
+        """
+        tokenizer = self.kokoro.tokenizer
+        # Loading a backend changes espeak's global state, like phonemizing does
+        with tokenizer._phonemize_lock:
+            tokenizer.get_backend(lang)
+
+    async def _speech(self, request: Request, writer: asyncio.StreamWriter):
+        options, response_format = self._parse_speech(request)
+        try:
+            encoder = get_encoder(response_format, options["sample_rate"])
+        except (ImportError, ValueError) as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e), "response_format") from e
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._check_lang, options["lang"])
+        except RuntimeError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e), "lang") from e
+
+        self._requests += 1
+        if self._slots.locked() and self._waiting >= self.max_queue:
+            self._rejected += 1
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Server is busy")
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._active += 1
+        try:
+            start_t = time.time()
+            stream = self.kokoro.create_stream(
+                **options, first_chunk_phonemes=self.first_chunk_phonemes or None
+            )
+            # Closing the stream cancels the creation when the client disconnects
+            async with contextlib.aclosing(encode_stream(stream, encoder)) as chunks:
+                await self._send(
+                    writer,
+                    HTTPStatus.OK,
+                    {
+                        "Content-Type": encoder.content_type,
+                        "Transfer-Encoding": "chunked",
+                        "Connection": "keep-alive" if request.keep_alive else "close",
+                    },
+                )
+                async for data in chunks:
+                    # A copy, the transport keeps what it can't send yet while encoders reuse their buffers
+                    writer.writelines(
+                        [f"{len(data):x}\r\n".encode(), bytes(data), b"\r\n"]
+                    )
+                    # Wait for slow clients instead of buffering the whole audio
+                    await writer.drain()
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+            log.debug(
+                "Streamed %d characters in %.2fs",
+                len(options["text"]),
+                time.time() - start_t,
+            )
+        finally:
+            self._active -= 1
+            self._slots.release()
+
+
+async def serve(
+    server: SpeechServer,
+    host: str,
+    port: int,
+    warmup: bool = True,
+    langs: list[str] | None = None,
+):
+    listener = await server.start(host, port)
+    print(f"Listening on http://{host}:{port}")
+    warmup_task = None
+    if warmup:
+        # Accept connections (and answer /health) while warming up
+        warmup_task = asyncio.create_task(server.warmup(langs))
+    else:
+        server.ready = True
+    async with listener:
+        await listener.serve_forever()
+    if warmup_task is not None:
+        await warmup_task
+
+
+def main():
+    parser = argparse.ArgumentParser("kokoro-onnx-server")
+    parser.add_argument("--model", default="kokoro-v1.0.onnx")
+    parser.add_argument("--voices", default="voices-v1.0.bin")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8880)
+    parser.add_argument(
+        "--pool_size", type=int, default=1, help="Sessions running at once"
+    )
+    parser.add_argument(
+        "--max_concurrency",
+        type=int,
+        default=None,
+        help="Requests creating audio at once, defaults to pool_size (times max_batch_size with batching)",
+    )
+    parser.add_argument(
+        "--max_queue",
+        type=int,
+        default=16,
+        help="Requests waiting for their turn before the server answers 503",
+    )
+    parser.add_argument("--default_format", default="wav", choices=list(ENCODERS))
+    parser.add_argument("--first_chunk_phonemes", type=int, default=50)
+    parser.add_argument("--max_input_length", type=int, default=MAX_INPUT_LENGTH)
+    parser.add_argument(
+        "--langs", nargs="*", default=["en-us"], help="espeak languages to warm up"
+    )
+    parser.add_argument("--no_warmup", action="store_true")
+    parser.add_argument(
+        "--batch_window",
+        type=float,
+        default=0.0,
+        help="Seconds to collect chunks of concurrent requests into a batch, 0 disables batching",
+    )
+    parser.add_argument("--max_batch_size", type=int, default=16)
+    args = parser.parse_args()
+
+    scheduler = None
+    if args.batch_window > 0:
+        scheduler = BatchScheduler(args.batch_window, args.max_batch_size)
+    kokoro = Kokoro(
+        args.model, args.voices, pool_size=args.pool_size, scheduler=scheduler
+    )
+    max_concurrency = args.max_concurrency or args.pool_size
+    if scheduler is not None and not args.max_concurrency:
+        # Batches can only fill up with enough requests in flight
+        max_concurrency *= args.max_batch_size
+    server = SpeechServer(
+        kokoro,
+        max_concurrency=max_concurrency,
+        max_queue=args.max_queue,
+        default_format=args.default_format,
+        first_chunk_phonemes=args.first_chunk_phonemes,
+        max_input_length=args.max_input_length,
+    )
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve(server, args.host, args.port, not args.no_warmup, args.langs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import platform
+from dataclasses import dataclass
+from pathlib import Path
+
+import onnxruntime as rt
+
+from .log import log
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": rt.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": rt.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": rt.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": rt.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+EXECUTION_MODES = {
+    "sequential": rt.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": rt.ExecutionMode.ORT_PARALLEL,
+}
+
+
+@dataclass
+class SessionProfile:
+    """
+    ONNX Runtime session options for Kokoro(session_profile=...)
+    See https://onnxruntime.ai/docs/performance/tune-performance/threading.html
+
+    Thread counts of 0 and allow_spinning None keep ONNX Runtime's defaults.
+    optimized_model_dir caches the optimized graph keyed by model hash, ONNX Runtime version,
+    optimization level and providers, so later starts skip graph optimization.
+    The model hash is kept in model-hashes.json there, so later starts don't hash the model either.
+    """
+
+    intra_op_num_threads: int = 0
+    inter_op_num_threads: int = 0
+    execution_mode: str = "sequential"
+    allow_spinning: bool | None = None
+    graph_optimization_level: str = "all"
+    enable_cpu_mem_arena: bool = True
+    enable_mem_pattern: bool = True
+    optimized_model_dir: str | None = None
+
+    def session_options(self) -> rt.SessionOptions:
+        sess_options = rt.SessionOptions()
+        sess_options.intra_op_num_threads = self.intra_op_num_threads
+        sess_options.inter_op_num_threads = self.inter_op_num_threads
+        sess_options.execution_mode = EXECUTION_MODES[self.execution_mode]
+        sess_options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[
+            self.graph_optimization_level
+        ]
+        sess_options.enable_cpu_mem_arena = self.enable_cpu_mem_arena
+        sess_options.enable_mem_pattern = self.enable_mem_pattern
+        if self.allow_spinning is not None:
+            spinning = "1" if self.allow_spinning else "0"
+            sess_options.add_session_config_entry(
+                "session.intra_op.allow_spinning", spinning
+            )
+            sess_options.add_session_config_entry(
+                "session.inter_op.allow_spinning", spinning
+            )
+        return sess_options
+
+
+def _model_hash(model_path: str, cache_dir: Path) -> str:
+    """
+    Content hash of the model, remembered in cache_dir by path, size and mtime
+    so later starts don't read hundreds of MBs again
+    """
+    stat = os.stat(model_path)
+    stat_key = f"{os.path.abspath(model_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    hashes_path = cache_dir / "model-hashes.json"
+    hashes = {}
+    try:
+        with open(hashes_path, encoding="utf-8") as fp:
+            hashes = json.load(fp)
+    except (OSError, ValueError):
+        pass
+    if stat_key in hashes:
+        return hashes[stat_key]
+
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as fp:
+        while chunk := fp.read(1024 * 1024):
+            digest.update(chunk)
+    hashes[stat_key] = digest.hexdigest()[:16]
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = hashes_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as fp:
+        json.dump(hashes, fp)
+    os.replace(tmp_path, hashes_path)
+    return hashes[stat_key]
+
+
+def optimized_model_path(
+    model_path: str, providers: list[str], profile: SessionProfile
+) -> Path | None:
+    """
+    Where the optimized graph of the model is cached, None without profile.optimized_model_dir.
+    Resolve it once and pass it to every create_session call of a pool.
+    """
+    if not profile.optimized_model_dir:
+        return None
+    cache_dir = Path(profile.optimized_model_dir)
+    # Optimized graphs can contain hardware and provider specific nodes, so they are part of the key
+    key = "-".join(
+        [
+            _model_hash(model_path, cache_dir),
+            f"ort{rt.__version__}",
+            profile.graph_optimization_level,
+            platform.machine(),
+            *providers,
+        ]
+    )
+    return cache_dir / f"{key}.onnx"
+
+
+def create_session(
+    model_path: str,
+    providers: list[str],
+    profile: SessionProfile,
+    cached_path: Path | None = None,
+) -> rt.InferenceSession:
+    """
+    cached_path is the optimized_model_path of the model, the optimized graph is loaded from it or saved to it
+    """
+    sess_options = profile.session_options()
+    if cached_path is None:
+        return rt.InferenceSession(
+            model_path, providers=providers, sess_options=sess_options
+        )
+
+    if cached_path.exists():
+        log.debug(f"Loading optimized model from {cached_path}")
+        # Already optimized, don't spend time on it again
+        sess_options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS["disable"]
+        return rt.InferenceSession(
+            str(cached_path), providers=providers, sess_options=sess_options
+        )
+
+    log.debug(f"Saving optimized model to {cached_path}")
+    cached_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write next to the final path first, so concurrent starts never load a partial file
+    tmp_path = cached_path.with_suffix(f".{os.getpid()}.tmp")
+    sess_options.optimized_model_filepath = str(tmp_path)
+    session = rt.InferenceSession(
+        model_path, providers=providers, sess_options=sess_options
+    )
+    if tmp_path.exists():
+        os.replace(tmp_path, cached_path)
+    return session
@@ -1,78 +1,290 @@
 import ctypes
+import itertools
 import os
 import platform
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
 
-import espeakng_loader
-import phonemizer
-from phonemizer.backend.espeak.wrapper import EspeakWrapper
+import numpy as np
+from numpy.typing import NDArray
 
-from .config import DEFAULT_VOCAB, MAX_PHONEME_LENGTH, EspeakConfig
+from .cache import LRUCache
+from .config import MAX_PHONEME_LENGTH, EspeakConfig, get_vocab
 from .log import log
 
+if TYPE_CHECKING:
+    from phonemizer.backend import EspeakBackend
+
+# Lines per espeak backend call in phonemize_batch
+PHONEMIZE_BATCH_LINES = 256
+# Below this many characters str.translate beats numpy's per call overhead
+TRANSLATE_MAX_LENGTH = 128
+
+
+class VocabTables:
+    """
+    Precompiled vocab lookups that map a phoneme string to tokens or strip unknown symbols in one pass.
+    Short strings go through str.translate tables, longer ones through a codepoint indexed numpy array.
+    """
+
+    def __init__(self, vocab: dict[str, int]):
+        size = max(map(ord, vocab), default=0) + 1
+        # Token of every codepoint up to the largest one in the vocab, -1 for symbols not in it.
+        # The extra last entry is -1 too, larger codepoints are clipped to it.
+        self.lookup = np.full(size + 1, -1, np.int64)
+        # str.translate tables, None deletes, codepoints past the end are left as is
+        self.filter_table: list[str | None] = [None] * size
+        for symbol, token in vocab.items():
+            self.lookup[ord(symbol)] = token
+            self.filter_table[ord(symbol)] = symbol
+        # Tokens as latin-1 characters, only possible when they all fit in a byte.
+        # At least 256 long, so symbols it keeps can't be encoded as latin-1
+        self.token_table: list[str | None] | None = None
+        if all(0 <= token < 256 for token in vocab.values()):
+            self.token_table = [None] * max(size, 256)
+            for symbol, token in vocab.items():
+                self.token_table[ord(symbol)] = chr(token)
+        self.size = size
+
+    def _lookup(self, phonemes: str) -> tuple[NDArray[np.uint32], NDArray[np.int64]]:
+        codepoints = np.frombuffer(phonemes.encode("utf-32-le"), dtype=np.uint32)
+        return codepoints, self.lookup[np.minimum(codepoints, self.size)]
+
+    def filter(self, phonemes: str) -> str:
+        if len(phonemes) < TRANSLATE_MAX_LENGTH:
+            filtered = phonemes.translate(self.filter_table)
+            # Symbols past the end of the table are kept by translate
+            if not filtered or ord(max(filtered)) < self.size:
+                return filtered
+        codepoints, tokens = self._lookup(phonemes)
+        return codepoints[tokens >= 0].tobytes().decode("utf-32-le")
+
+    def tokenize(self, phonemes: str) -> NDArray[np.int64]:
+        if self.token_table is not None and len(phonemes) < TRANSLATE_MAX_LENGTH:
+            try:
+                tokens = phonemes.translate(self.token_table).encode("latin-1")
+                return np.frombuffer(tokens, dtype=np.uint8).astype(np.int64)
+            except UnicodeEncodeError:
+                # Symbols past the end of the table are kept by translate
+                pass
+        _, tokens = self._lookup(phonemes)
+        return tokens[tokens >= 0]
+
 
 class Tokenizer:
-    def __init__(self, espeak_config: EspeakConfig | None = None, vocab: dict = None):
-        self.vocab = vocab or DEFAULT_VOCAB
-
-        if not espeak_config:
-            espeak_config = EspeakConfig()
-        if not espeak_config.data_path:
-            espeak_config.data_path = espeakng_loader.get_data_path()
-        if not espeak_config.lib_path:
-            espeak_config.lib_path = espeakng_loader.get_library_path()
-
-        # Check if PHONEMIZER_ESPEAK_LIBRARY was set
-        if os.getenv("PHONEMIZER_ESPEAK_LIBRARY"):
-            espeak_config.lib_path = os.getenv("PHONEMIZER_ESPEAK_LIBRARY")
-
-        # Check that the espeak-ng library can be loaded
-        try:
-            ctypes.cdll.LoadLibrary(espeak_config.lib_path)
-        except Exception as e:
-            log.error(f"Failed to load espeak shared library: {e}")
-            log.warning("Falling back to system wide espeak-ng library")
-
-            # Fallback system wide load
-            error_info = (
-                "Failed to load espeak-ng from fallback. Please install espeak-ng system wide.\n"
-                "\tSee https://github.com/espeak-ng/espeak-ng/blob/master/docs/guide.md\n"
-                "\tNote: you can specify shared library path using PHONEMIZER_ESPEAK_LIBRARY environment variable.\n"
-                f"Environment:\n\t{platform.platform()} ({platform.release()}) | {sys.version}"
-            )
-            espeak_config.lib_path = ctypes.util.find_library(
-                "espeak-ng"
-            ) or ctypes.util.find_library("espeak")
+    def __init__(
+        self,
+        espeak_config: EspeakConfig | None = None,
+        vocab: dict = None,
+        backend_cache_size: int = 8,
+        phoneme_cache_size: int = 1024,
+    ):
+        self.vocab = vocab or get_vocab()
+        # Initialised espeak backends keyed by language and options, reused across phonemize calls
+        self.backends: LRUCache[EspeakBackend] = LRUCache(backend_cache_size)
+        # Phonemes of recently seen texts, set maxsize to 0 to disable
+        self.phonemes: LRUCache[str] = LRUCache(phoneme_cache_size)
+
+        # Lookup tables of the vocab, rebuilt when the vocab is replaced
+        self._tables_key = None
+        self._tables: VocabTables | None = None
+
+        self.espeak_config = espeak_config or EspeakConfig()
+        # phonemizer and espeak-ng are loaded on first phonemize, tokenizing phonemes doesn't need them
+        self._espeak_loaded = False
+        self._espeak_lock = threading.Lock()
+        # espeak-ng keeps global state, concurrent create calls from threads take turns phonemizing
+        self._phonemize_lock = threading.Lock()
+
+    def _load_espeak(self):
+        with self._espeak_lock:
+            if self._espeak_loaded:
+                return
+            import espeakng_loader
+            from phonemizer.backend.espeak.wrapper import EspeakWrapper
+
+            espeak_config = self.espeak_config
+            if not espeak_config.data_path:
+                espeak_config.data_path = espeakng_loader.get_data_path()
             if not espeak_config.lib_path:
-                raise RuntimeError(error_info)
+                espeak_config.lib_path = espeakng_loader.get_library_path()
+
+            # Check if PHONEMIZER_ESPEAK_LIBRARY was set
+            if os.getenv("PHONEMIZER_ESPEAK_LIBRARY"):
+                espeak_config.lib_path = os.getenv("PHONEMIZER_ESPEAK_LIBRARY")
+
+            # Check that the espeak-ng library can be loaded
             try:
                 ctypes.cdll.LoadLibrary(espeak_config.lib_path)
             except Exception as e:
-                raise RuntimeError(f"{e}: {error_info}")
+                log.error(f"Failed to load espeak shared library: {e}")
+                log.warning("Falling back to system wide espeak-ng library")
 
-        EspeakWrapper.set_data_path(espeak_config.data_path)
-        EspeakWrapper.set_library(espeak_config.lib_path)
+                # Fallback system wide load
+                error_info = (
+                    "Failed to load espeak-ng from fallback. Please install espeak-ng system wide.\n"
+                    "\tSee https://github.com/espeak-ng/espeak-ng/blob/master/docs/guide.md\n"
+                    "\tNote: you can specify shared library path using PHONEMIZER_ESPEAK_LIBRARY environment variable.\n"
+                    f"Environment:\n\t{platform.platform()} ({platform.release()}) | {sys.version}"
+                )
+                espeak_config.lib_path = ctypes.util.find_library(
+                    "espeak-ng"
+                ) or ctypes.util.find_library("espeak")
+                if not espeak_config.lib_path:
+                    raise RuntimeError(error_info)
+                try:
+                    ctypes.cdll.LoadLibrary(espeak_config.lib_path)
+                except Exception as e:
+                    raise RuntimeError(f"{e}: {error_info}")
+
+            EspeakWrapper.set_data_path(espeak_config.data_path)
+            EspeakWrapper.set_library(espeak_config.lib_path)
+            self._espeak_loaded = True
 
     @staticmethod
     def normalize_text(text) -> str:
         return text.strip()
 
-    def tokenize(self, phonemes):
+    def _vocab_tables(self) -> VocabTables:
+        key = (id(self.vocab), len(self.vocab))
+        if self._tables_key != key:
+            self._tables = VocabTables(self.vocab)
+            self._tables_key = key
+        return self._tables
+
+    def filter_phonemes(self, phonemes: str) -> str:
+        """
+        Remove symbols that are not in the vocab
+        """
+        return self._vocab_tables().filter(phonemes)
+
+    def tokenize(self, phonemes: str) -> NDArray[np.int64]:
         if len(phonemes) > MAX_PHONEME_LENGTH:
             raise ValueError(
                 f"text is too long, must be less than {MAX_PHONEME_LENGTH} phonemes"
             )
-        return [i for i in map(self.vocab.get, phonemes) if i is not None]
+        return self._vocab_tables().tokenize(phonemes)
+
+    def get_backend(
+        self, lang: str, preserve_punctuation=True, with_stress=True
+    ) -> "EspeakBackend":
+        key = (lang, preserve_punctuation, with_stress)
+        backend = self.backends.get(key)
+        if backend is None:
+            self._load_espeak()
+            from phonemizer.backend import EspeakBackend
+
+            log.debug(f"Initialising espeak backend for {key}")
+            backend = EspeakBackend(
+                lang,
+                preserve_punctuation=preserve_punctuation,
+                with_stress=with_stress,
+            )
+            self.backends.put(key, backend)
+        return backend
 
     def phonemize(self, text, lang="en-us", norm=True) -> str:
         """
         lang can be 'en-us' or 'en-gb'
         """
+        return self.phonemize_batch([text], lang, norm)[0]
+
+    def phonemize_batch(
+        self, texts: list[str], lang="en-us", norm=True, njobs: int = 1
+    ) -> list[str]:
+        """
+        Phonemize many texts with a single espeak backend call, returned in the order of texts.
+        njobs splits the utterances between that many worker processes, espeak isn't thread safe.
+        Like any multiprocessing code, scripts using njobs need an if __name__ == "__main__" guard.
+        """
         if norm:
-            text = Tokenizer.normalize_text(text)
+            texts = [Tokenizer.normalize_text(text) for text in texts]
+
+        results: list[str | None] = []
+        # Texts that aren't cached -> their indexes in texts
+        pending: dict[str, list[int]] = {}
+        for i, text in enumerate(texts):
+            # The vocab is part of the key since phonemes are filtered with it
+            phonemes = self.phonemes.get((text, lang, id(self.vocab), len(self.vocab)))
+            results.append(phonemes)
+            if phonemes is None:
+                pending.setdefault(text, []).append(i)
+
+        # Each line is an utterance, empty lines are ignored like phonemizer.phonemize() does
+        lines: list[str] = []
+        owners: list[str] = []
+        for text in pending:
+            for line in text.splitlines():
+                if line.strip():
+                    lines.append(line)
+                    owners.append(text)
+        phonemized = dict.fromkeys(pending, "")
+        if lines:
+            from phonemizer.separator import default_separator
+
+            log.debug(f"Phonemizing {len(lines)} lines of {len(pending)} texts")
+            # phonemizer slows down per line on long lists, hand it slices
+            parts = [
+                lines[i : i + PHONEMIZE_BATCH_LINES]
+                for i in range(0, len(lines), PHONEMIZE_BATCH_LINES)
+            ]
+            if njobs > 1 and len(lines) > 1:
+                output = self._phonemize_parallel(parts, lang, njobs)
+            else:
+                with self._phonemize_lock:
+                    backend = self.get_backend(lang)
+                    output = list(
+                        itertools.chain.from_iterable(
+                            backend.phonemize(
+                                part, separator=default_separator, strip=False
+                            )
+                            for part in parts
+                        )
+                    )
+            for text, line_phonemes in zip(owners, output):
+                phonemized[text] += line_phonemes
+
+        for text, indexes in pending.items():
+            phonemes = self.filter_phonemes(phonemized[text]).strip()
+            self.phonemes.put((text, lang, id(self.vocab), len(self.vocab)), phonemes)
+            for i in indexes:
+                results[i] = phonemes
+        return results
+
+    def _phonemize_parallel(
+        self, parts: list[list[str]], lang: str, njobs: int
+    ) -> list[str]:
+        """
+        Phonemize parts of lines in worker processes, each with its own espeak
+        """
+        self._load_espeak()
+        with ProcessPoolExecutor(
+            max_workers=min(njobs, len(parts)),
+            initializer=_init_worker,
+            initargs=(self.espeak_config, lang),
+        ) as executor:
+            return list(
+                itertools.chain.from_iterable(executor.map(_worker_phonemize, parts))
+            )
+
+
+# Backend of a phonemize_batch worker process
+_worker_backend: "EspeakBackend | None" = None
+
+
+def _init_worker(espeak_config: EspeakConfig, lang: str):
+    global _worker_backend
+    from phonemizer.backend import EspeakBackend
+    from phonemizer.backend.espeak.wrapper import EspeakWrapper
+
+    EspeakWrapper.set_data_path(espeak_config.data_path)
+    EspeakWrapper.set_library(espeak_config.lib_path)
+    _worker_backend = EspeakBackend(lang, preserve_punctuation=True, with_stress=True)
+
+
+def _worker_phonemize(lines: list[str]) -> list[str]:
+    from phonemizer.separator import default_separator
 
-        phonemes = phonemizer.phonemize(
-            text, lang, preserve_punctuation=True, with_stress=True
-        )
-        phonemes = "".join(filter(lambda p: p in self.vocab, phonemes))
-        return phonemes.strip()
+    return _worker_backend.phonemize(lines, separator=default_separator, strip=False)
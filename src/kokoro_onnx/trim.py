@@ -741,3 +741,121 @@ def frames_to_samples(
         offset = int(n_fft // 2)
 
     return (np.asanyarray(frames) * hop_length + offset).astype(int)
+
+
+# Below are kokoro-onnx's own fast paths for the mono float32 audio the model creates,
+# they match trim() with its default ref=np.max without framing the whole signal
+
+
+def _frame_energies(y: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """
+    Sum of squares of every centered (zero padded) frame, like rms() frames them.
+    Each hop sized block is summed once, frames add up frame_length // hop_length neighbouring blocks.
+    """
+    pad_blocks = frame_length // 2 // hop_length
+    blocks_per_frame = frame_length // hop_length
+    n_frames = 1 + (len(y) + 2 * (frame_length // 2) - frame_length) // hop_length
+    full = len(y) // hop_length
+    blocks = y[: full * hop_length].reshape(full, hop_length)
+    energies = np.zeros(pad_blocks + full + 1 + blocks_per_frame + pad_blocks)
+    # Row wise dot products, without a temporary array of squares
+    energies[pad_blocks : pad_blocks + full] = np.einsum("ij,ij->i", blocks, blocks)
+    rest = y[full * hop_length :]
+    energies[pad_blocks + full] = np.dot(rest, rest)
+    cumulative = np.concatenate([[0.0], np.cumsum(energies)])
+    return (
+        cumulative[blocks_per_frame : blocks_per_frame + n_frames]
+        - cumulative[:n_frames]
+    )
+
+
+def fast_trim(
+    y: np.ndarray,
+    *,
+    top_db: float = 60,
+    frame_length: int = 2048,
+    hop_length: int = 512,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Trim leading and trailing silence from mono audio, same as trim(y) with the default reference.
+    Falls back to trim() when frame_length and half of it aren't multiples of hop_length.
+    """
+    if (
+        y.ndim != 1
+        or not len(y)
+        or frame_length % hop_length
+        or (frame_length // 2) % hop_length
+    ):
+        return trim(y, top_db=top_db, frame_length=frame_length, hop_length=hop_length)
+    power = np.maximum(
+        _frame_energies(y.astype(np.float32, copy=False), frame_length, hop_length)
+        / frame_length,
+        1e-10,
+    )
+    non_silent = power > power.max() * 10 ** (-top_db / 10)
+    # Only the head and the tail are scanned for the first and last non silent frames
+    first = int(np.argmax(non_silent))
+    if not non_silent[first]:
+        return y[0:0], np.asarray([0, 0])
+    last = len(non_silent) - 1 - int(np.argmax(non_silent[::-1]))
+    start = first * hop_length
+    end = min(len(y), (last + 1) * hop_length)
+    return y[start:end], np.asarray([start, end])
+
+
+class StreamTrimmer:
+    """
+    Trim the leading silence of a stream of audio pieces without waiting for all of it.
+    The stream's loudest frame isn't known yet, so silence is top_db below the fixed reference amplitude ref.
+    Pieces are held back only while they're silent, everything after the first non silent frame passes through.
+    """
+
+    def __init__(
+        self,
+        top_db: float = 60,
+        ref: float = 1.0,
+        frame_length: int = 2048,
+        hop_length: int = 512,
+    ):
+        assert (
+            frame_length % hop_length == 0 and (frame_length // 2) % hop_length == 0
+        ), "frame_length and half of it should be multiples of hop_length"
+        self.threshold = max(ref**2, 1e-10) * 10 ** (-top_db / 10)
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self.reset()
+
+    def reset(self):
+        self.started = False
+        # Held back audio, starting at sample self._offset of the stream
+        self._pending = np.zeros(0, np.float32)
+        self._offset = 0
+        self._next_frame = 0
+
+    def push(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Returns the part of audio that follows the leading silence, empty while it's still silent
+        """
+        if self.started:
+            return audio
+        self._pending = np.concatenate([self._pending, audio])
+        # Frames are centered like fast_trim's: frame j covers the frame_length samples around
+        # sample j * hop_length of the stream, only frames complete in what was pushed are looked at
+        pad = self.frame_length // 2
+        stream_len = self._offset + len(self._pending)
+        n_frames = max(0, (stream_len + pad - self.frame_length) // self.hop_length + 1)
+        for j in range(self._next_frame, n_frames):
+            start = j * self.hop_length - pad - self._offset
+            frame = self._pending[max(start, 0) : start + self.frame_length]
+            if np.dot(frame, frame) / self.frame_length > self.threshold:
+                self.started = True
+                audio = self._pending[j * self.hop_length - self._offset :]
+                self._pending = np.zeros(0, np.float32)
+                return audio
+        self._next_frame = max(self._next_frame, n_frames)
+        # Samples before the next frame are trimmed whatever comes next
+        drop = self._next_frame * self.hop_length - pad - self._offset
+        if drop > 0:
+            self._pending = self._pending[drop:]
+            self._offset += drop
+        return audio[0:0]
@@ -0,0 +1,97 @@
+"""
+Voice store with all voices in one contiguous float32 array, opened with np.memmap.
+
+Voices are paged in on demand and shared between processes through the page cache,
+instead of every process reading its own copy out of the npz voices file.
+
+File layout: MAGIC, little-endian uint32 header length, JSON header (names, shape, offset),
+then the (voices, *shape) float32 array at offset.
+"""
+
+import json
+import struct
+from collections.abc import Iterator, Mapping
+
+import numpy as np
+from numpy.typing import NDArray
+
+MAGIC = b"KOKOVOX1"
+# Data offset alignment, keeps the array page friendly
+ALIGNMENT = 4096
+
+
+class VoiceStore(Mapping[str, NDArray[np.float32]]):
+    def __init__(self, path: str):
+        with open(path, "rb") as fp:
+            if fp.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a kokoro-onnx voice store")
+            (header_len,) = struct.unpack("<I", fp.read(4))
+            header = json.loads(fp.read(header_len))
+        self.names: list[str] = header["names"]
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self._data = np.memmap(
+            path,
+            dtype=np.float32,
+            mode="r",
+            offset=header["offset"],
+            shape=(len(self.names), *header["shape"]),
+        )
+
+    def __getitem__(self, name: str) -> NDArray[np.float32]:
+        return self._data[self._index[name]]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def is_voice_store(path: str) -> bool:
+    with open(path, "rb") as fp:
+        return fp.read(len(MAGIC)) == MAGIC
+
+
+def load_voices(path: str) -> Mapping[str, NDArray[np.float32]]:
+    """
+    Open a voice store, or fall back to loading the npz voices file (e.g. voices-v1.0.bin)
+    """
+    if is_voice_store(path):
+        return VoiceStore(path)
+    # Read every voice up front, the lazy NpzFile shares one zip handle and isn't thread safe
+    with np.load(path) as voices:
+        return {name: voices[name] for name in voices.files}
+
+
+def convert_voices(voices_path: str, output_path: str):
+    """
+    Convert an npz voices file (e.g. voices-v1.0.bin) to a voice store
+    """
+    voices = np.load(voices_path)
+    names = sorted(voices.keys())
+    shape = voices[names[0]].shape
+    offset = 0
+    # The header length depends on the offset written in it, grow until it fits
+    while True:
+        header = json.dumps(
+            {"names": names, "shape": list(shape), "offset": offset}
+        ).encode()
+        header_end = len(MAGIC) + 4 + len(header)
+        if header_end <= offset:
+            break
+        offset = -(-header_end // ALIGNMENT) * ALIGNMENT
+
+    with open(output_path, "wb") as fp:
+        fp.write(MAGIC)
+        fp.write(struct.pack("<I", len(header)))
+        fp.write(header)
+        fp.write(b"\0" * (offset - fp.tell()))
+        for name in names:
+            voice = np.asarray(voices[name], dtype=np.float32)
+            assert voice.shape == shape, (
+                f"Voice {name} has shape {voice.shape}, expected {shape}"
+            )
+            fp.write(np.ascontiguousarray(voice).tobytes())